@@ -1,10 +1,19 @@
 """Configuration settings for the metagenomics pipeline."""
 import os
+from dataclasses import dataclass
 from pathlib import Path
-from dotenv import load_dotenv
+from types import MappingProxyType
+from typing import Mapping
 
-# Load environment variables
-load_dotenv()
+# Load environment variables, preferring the compiled cache from tools/cache_env.py
+try:
+    from config_cache import ENV as _CACHED_ENV
+except ImportError:
+    from dotenv import load_dotenv
+    load_dotenv()
+else:
+    for _key, _value in _CACHED_ENV.items():
+        os.environ.setdefault(_key, _value)
 
 # GCP Configuration
 GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID", "")
@@ -16,43 +25,63 @@ GCP_SERVICE_ACCOUNT_KEY = os.getenv("GCP_SERVICE_ACCOUNT_KEY", "")
 REPOSITORY_URL = os.getenv("REPOSITORY_URL", "https://github.com/sathishthangasamy/metagenomics.git")
 
 # VM Configuration
-VM_CONFIGS = {
-    "standard": {
-        "machine_type": "n1-standard-16",
-        "boot_disk_size_gb": 100,
-        "preemptible": True,
-    },
-    "highmem": {
-        "machine_type": "n1-highmem-16",
-        "boot_disk_size_gb": 100,
-        "preemptible": True,
-    }
-}
+@dataclass(frozen=True, slots=True)
+class VMConfig:
+    """VM provisioning settings."""
+    machine_type: str
+    boot_disk_size_gb: int = 100
+    preemptible: bool = True
+
+
+VM_CONFIGS: Mapping[str, VMConfig] = MappingProxyType({
+    "standard": VMConfig(
+        machine_type="n1-standard-16",
+        boot_disk_size_gb=100,
+        preemptible=True,
+    ),
+    "highmem": VMConfig(
+        machine_type="n1-highmem-16",
+        boot_disk_size_gb=100,
+        preemptible=True,
+    ),
+})
 
 # Pipeline Defaults
 DEFAULT_THREADS = 16
 DEFAULT_MIN_CONTIG_LEN = 1000
 
 # Pipeline Steps
-PIPELINE_STEPS = {
-    "fastqc": {"name": "FastQC", "enabled": True, "emoji": "🔍"},
-    "trimmomatic": {"name": "Trimmomatic", "enabled": True, "emoji": "✂️"},
-    "megahit": {"name": "MEGAHIT Assembly", "enabled": True, "emoji": "🧬"},
-    "prodigal": {"name": "Prodigal", "enabled": True, "emoji": "🔬"},
-    "hmmscan": {"name": "HMMscan (Pfam)", "enabled": True, "emoji": "🎯"},
-    "binning": {"name": "MetaBAT2 Binning", "enabled": True, "emoji": "📦"},
-    "checkm": {"name": "CheckM Quality", "enabled": True, "emoji": "✓"},
-}
+@dataclass(frozen=True, slots=True)
+class PipelineStep:
+    """Display settings for a pipeline step."""
+    name: str
+    enabled: bool
+    emoji: str
+
+
+PIPELINE_STEPS: Mapping[str, PipelineStep] = MappingProxyType({
+    "fastqc": PipelineStep("FastQC", True, "🔍"),
+    "trimmomatic": PipelineStep("Trimmomatic", True, "✂️"),
+    "megahit": PipelineStep("MEGAHIT Assembly", True, "🧬"),
+    "prodigal": PipelineStep("Prodigal", True, "🔬"),
+    "hmmscan": PipelineStep("HMMscan (Pfam)", True, "🎯"),
+    "binning": PipelineStep("MetaBAT2 Binning", True, "📦"),
+    "checkm": PipelineStep("CheckM Quality", True, "✓"),
+})
 
 # Cost Estimation (per hour in USD)
-COST_PER_HOUR = {
+COST_PER_HOUR: Mapping[str, float] = MappingProxyType({
     "n1-standard-16": 0.38,  # Preemptible price
     "n1-highmem-16": 0.47,   # Preemptible price
-}
+})
 
 # File size limits
 MAX_FILE_SIZE_GB = 30
 CHUNK_SIZE_MB = 256  # For chunked uploads
+DOWNLOAD_CHUNK_SIZE_MB = 32  # For parallel ranged downloads
+TRANSFER_MAX_WORKERS = 8  # Parallel chunk transfers per file
+SIGNED_URL_MAX_WORKERS = 16  # Parallel signed URL generation for results
+LIST_MAX_WORKERS = 16  # Parallel sub-prefix listings when browsing GCS
 
 # Paths
 BASE_DIR = Path(__file__).parent
@@ -64,17 +93,28 @@ PIPELINE_DIR = BASE_DIR / "pipeline"
 GCS_BROWSER_DEFAULT_BUCKET = os.getenv("GCS_DEFAULT_BUCKET", "")
 GCS_BROWSER_DEFAULT_PREFIX = os.getenv("GCS_DEFAULT_PREFIX", "samples/")
 GCS_ALLOWED_EXTENSIONS = [".fq.gz", ".fastq.gz", ".fq", ".fastq"]
+GCS_LIST_TTL_SECONDS = 60  # Reuse a bucket/prefix listing for this long
+GCS_BROWSER_MAX_FILES = 500  # Stop listing once this many files match
+
+# Optional Pub/Sub subscription receiving GCS notifications for jobs/ (see README)
+GCS_STATUS_SUBSCRIPTION = os.getenv("GCS_STATUS_SUBSCRIPTION", "")
 
 # Gradio Configuration
 GRADIO_SERVER_NAME = "0.0.0.0"
 GRADIO_SERVER_PORT = 7860
 GRADIO_SHARE = False
+GRADIO_CONCURRENCY_LIMIT = 8  # Default concurrent runs per event handler
+GRADIO_MAX_QUEUE_SIZE = 64  # Pending events before new ones are rejected
+
+# Load theme fonts from Google Fonts; set THEME_GOOGLE_FONTS=0 for offline use
+THEME_GOOGLE_FONTS = os.getenv("THEME_GOOGLE_FONTS", "1") != "0"
+STATUS_PUSH_INTERVAL_SECONDS = 5  # How often job status changes are pushed to the UI
 
 # Status emojis
-STATUS_EMOJIS = {
+STATUS_EMOJIS: Mapping[str, str] = MappingProxyType({
     "pending": "⏳",
     "running": "🔄",
     "complete": "✅",
     "failed": "❌",
     "cancelled": "🚫",
-}
+})
@@ -1,6 +1,6 @@
 """GCP integration modules."""
-from .storage import StorageHandler
+from .storage import StorageHandler, get_storage_handler, shutdown
 from .launcher import VMLauncher
 from .monitor import JobMonitor
 
-__all__ = ['StorageHandler', 'VMLauncher', 'JobMonitor']
+__all__ = ['StorageHandler', 'get_storage_handler', 'shutdown', 'VMLauncher', 'JobMonitor']
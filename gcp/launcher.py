@@ -1,14 +1,145 @@
 """Google Compute Engine VM launcher for running the pipeline."""
-import time
-from typing import Dict, Optional
+import asyncio
+import functools
+import string
+import uuid
+from typing import Dict, List, Optional
 from google.cloud import compute_v1
 from google.oauth2 import service_account
+from gcp.retry import GCP_RETRY
 import config
 
 
+# Instance settings shared by every pipeline VM, built once at import.
+# Proto fields copy these on assignment, so the constants are never mutated.
+
+# Boot disk image
+_SOURCE_IMAGE = "projects/ubuntu-os-cloud/global/images/family/ubuntu-2204-lts"
+
+# Default network with an external IP
+_DEFAULT_NETWORK_INTERFACE = compute_v1.NetworkInterface(
+    name="global/networks/default",
+    access_configs=[
+        compute_v1.AccessConfig(name="External NAT", type_="ONE_TO_ONE_NAT")
+    ]
+)
+
+# Service account with necessary scopes
+_DEFAULT_SERVICE_ACCOUNT = compute_v1.ServiceAccount(
+    email="default",
+    scopes=[
+        "https://www.googleapis.com/auth/cloud-platform",
+        "https://www.googleapis.com/auth/devstorage.full_control",
+    ]
+)
+
+# Labels for tracking
+_INSTANCE_LABELS = {
+    "purpose": "metagenomics-pipeline",
+    "auto-delete": "true"
+}
+
+# VM startup script; ${...} slots are filled per job in generate_startup_script
+_STARTUP_SCRIPT_TEMPLATE = string.Template("""#!/bin/bash
+set -e
+
+# Log all output
+exec > >(tee -a /var/log/startup-script.log)
+exec 2>&1
+
+echo "Starting metagenomics pipeline for job: ${job_id}"
+echo "Timestamp: $$(date)"
+
+# Update and install dependencies
+apt-get update
+apt-get install -y docker.io git
+
+# Start Docker
+systemctl start docker
+systemctl enable docker
+
+# Clone the repository
+cd /home
+git clone ${repository_url}
+cd metagenomics
+
+# Build Docker image
+docker build -t metagenomics:latest .
+
+# Install additional tools in container
+docker run --name pipeline -d metagenomics:latest sleep infinity
+docker exec pipeline apt-get update
+docker exec pipeline apt-get install -y seqkit parallel vim google-cloud-sdk
+
+# Create data directory
+docker exec pipeline mkdir -p /data
+
+# Download input files from GCS; large uploads are composite objects (CRC32C
+# only, no MD5), which gsutil refuses to download without compiled crcmod
+echo "Downloading input files..."
+docker exec pipeline gcloud storage cp ${input_file_1} /data/CV_1.fq.gz
+docker exec pipeline gcloud storage cp ${input_file_2} /data/CV_2.fq.gz
+
+# Run the pipeline
+echo "Running pipeline with parameters:"
+echo "  Threads: ${threads}"
+echo "  Min contig length: ${min_contig_len}"
+echo "  Enabled steps: ${steps}"
+
+# Copy pipeline script
+docker cp pipeline/run.sh pipeline:/pipeline/run.sh
+docker exec pipeline chmod +x /pipeline/run.sh
+
+# Execute the pipeline
+docker exec pipeline /pipeline/run.sh \\
+    --threads ${threads} \\
+    --min-contig-len ${min_contig_len} \\
+    --steps "${steps}" \\
+    --job-id ${job_id} \\
+    --bucket ${bucket_name}
+
+# Upload results to GCS
+echo "Uploading results to GCS..."
+docker exec pipeline gsutil -m -h "Cache-Control:private, max-age=86400, immutable" cp -r /data/results/* gs://${bucket_name}/results/${job_id}/
+
+# Cleanup
+echo "Pipeline completed successfully"
+echo "Timestamp: $$(date)"
+
+# Create completion marker
+echo "DONE" | docker exec -i pipeline gsutil -h "Cache-Control:no-cache" cp - gs://${bucket_name}/jobs/${job_id}/status.txt
+
+# Shutdown the VM
+shutdown -h now
+""")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_instances_client(service_account_key: str = "") -> compute_v1.InstancesClient:
+    """
+    Get the process-wide Compute Engine client, creating it on first use.
+    
+    Args:
+        service_account_key: Optional path to a service account key file
+        
+    Returns:
+        Shared instances client
+    """
+    if service_account_key:
+        credentials = service_account.Credentials.from_service_account_file(
+            service_account_key
+        )
+        return compute_v1.InstancesClient(credentials=credentials)
+    
+    # Default credentials
+    return compute_v1.InstancesClient()
+
+
 class VMLauncher:
     """Handle VM provisioning and management on GCP."""
     
+    __slots__ = ("project_id", "zone", "client")
+    
     def __init__(self):
         """Initialize the Compute Engine client."""
         self.project_id = config.GCP_PROJECT_ID
@@ -17,16 +148,13 @@ class VMLauncher:
         
         if config.GCP_SERVICE_ACCOUNT_KEY:
             try:
-                credentials = service_account.Credentials.from_service_account_file(
-                    config.GCP_SERVICE_ACCOUNT_KEY
-                )
-                self.client = compute_v1.InstancesClient(credentials=credentials)
+                self.client = _get_instances_client(config.GCP_SERVICE_ACCOUNT_KEY)
             except Exception as e:
                 print(f"Warning: Could not initialize Compute Engine client: {e}")
         elif config.GCP_PROJECT_ID:
             # Try default credentials
             try:
-                self.client = compute_v1.InstancesClient()
+                self.client = _get_instances_client()
             except Exception as e:
                 print(f"Warning: Could not initialize Compute Engine client: {e}")
     
@@ -35,7 +163,7 @@ class VMLauncher:
         instance_name: str,
         machine_type: str,
         startup_script: str,
-        vm_config: Optional[Dict] = None
+        vm_config: Optional[config.VMConfig] = None
     ) -> Optional[str]:
         """
         Create and start a VM instance.
@@ -56,76 +184,28 @@ class VMLauncher:
         try:
             # Use default config if not provided
             if vm_config is None:
-                vm_config = config.VM_CONFIGS.get("standard", {})
-            
-            # Define the instance configuration
-            disk_config = compute_v1.AttachedDisk()
-            disk_config.boot = True
-            disk_config.auto_delete = True
-            
-            initialize_params = compute_v1.AttachedDiskInitializeParams()
-            initialize_params.source_image = (
-                "projects/ubuntu-os-cloud/global/images/family/ubuntu-2204-lts"
-            )
-            initialize_params.disk_size_gb = vm_config.get("boot_disk_size_gb", 100)
-            disk_config.initialize_params = initialize_params
-            
-            # Network configuration
-            network_interface = compute_v1.NetworkInterface()
-            network_interface.name = "global/networks/default"
-            
-            # Access config for external IP
-            access_config = compute_v1.AccessConfig()
-            access_config.name = "External NAT"
-            access_config.type_ = "ONE_TO_ONE_NAT"
-            network_interface.access_configs = [access_config]
-            
-            # Metadata for startup script
-            metadata = compute_v1.Metadata()
-            metadata.items = [
-                compute_v1.Items(key="startup-script", value=startup_script)
-            ]
-            
-            # Scheduling configuration (for preemptible VMs)
-            scheduling = compute_v1.Scheduling()
-            scheduling.preemptible = vm_config.get("preemptible", True)
-            scheduling.automatic_restart = False
-            scheduling.on_host_maintenance = "TERMINATE"
-            
-            # Service account with necessary scopes
-            service_account = compute_v1.ServiceAccount()
-            service_account.email = "default"
-            service_account.scopes = [
-                "https://www.googleapis.com/auth/cloud-platform",
-                "https://www.googleapis.com/auth/devstorage.full_control",
-            ]
+                vm_config = config.VM_CONFIGS["standard"]
             
             # Build the instance
-            instance = compute_v1.Instance()
-            instance.name = instance_name
-            instance.machine_type = f"zones/{self.zone}/machineTypes/{machine_type}"
-            instance.disks = [disk_config]
-            instance.network_interfaces = [network_interface]
-            instance.metadata = metadata
-            instance.scheduling = scheduling
-            instance.service_accounts = [service_account]
-            
-            # Labels for tracking
-            instance.labels = {
-                "purpose": "metagenomics-pipeline",
-                "auto-delete": "true"
-            }
+            instance = compute_v1.Instance(
+                name=instance_name,
+                machine_type=f"zones/{self.zone}/machineTypes/{machine_type}",
+                **self._build_instance_properties(vm_config, startup_script)
+            )
             
-            # Create the instance
-            operation = self.client.insert(
+            # Create the instance; retries reuse the request ID, so GCE
+            # deduplicates an insert whose response was lost
+            request = compute_v1.InsertInstanceRequest(
                 project=self.project_id,
                 zone=self.zone,
-                instance_resource=instance
+                instance_resource=instance,
+                request_id=str(uuid.uuid4())
             )
+            operation = self.client.insert(request=request, retry=GCP_RETRY)
             
             print(f"Creating VM instance: {instance_name}")
             print(f"Machine type: {machine_type}")
-            print(f"Preemptible: {vm_config.get('preemptible', True)}")
+            print(f"Preemptible: {vm_config.preemptible}")
             
             # Wait for the operation to complete
             self._wait_for_operation(operation)
@@ -137,35 +217,195 @@ class VMLauncher:
             print(f"Error creating VM: {e}")
             return None
     
-    def delete_vm(self, instance_name: str) -> bool:
+    async def create_vm_async(
+        self,
+        instance_name: str,
+        machine_type: str,
+        startup_script: str,
+        vm_config: Optional[config.VMConfig] = None
+    ) -> Optional[str]:
         """
-        Delete a VM instance.
+        Create and start a VM instance without blocking the event loop.
+        
+        Lets orchestration code provision several VMs concurrently, e.g.
+        ``await asyncio.gather(*(launcher.create_vm_async(...) for ...))``.
         
         Args:
-            instance_name: Name of the instance to delete
+            instance_name: Name for the VM instance
+            machine_type: Machine type (e.g., 'n1-standard-16')
+            startup_script: Startup script to run on the VM
+            vm_config: Optional additional VM configuration
             
         Returns:
-            True if successful, False otherwise
+            Instance name if successful, None otherwise
+        """
+        return await asyncio.to_thread(
+            self.create_vm,
+            instance_name,
+            machine_type,
+            startup_script,
+            vm_config
+        )
+    
+    def create_vms_bulk(
+        self,
+        name_pattern: str,
+        count: int,
+        machine_type: str,
+        startup_script: str,
+        vm_config: Optional[config.VMConfig] = None
+    ) -> Optional[str]:
+        """
+        Create several identical VM instances with a single bulk insert request.
+        
+        Args:
+            name_pattern: Instance name pattern with a run of '#' placeholders
+                (e.g., 'pipeline-job-###')
+            count: Number of instances to create
+            machine_type: Machine type (e.g., 'n1-standard-16')
+            startup_script: Startup script to run on every VM
+            vm_config: Optional additional VM configuration
+            
+        Returns:
+            Name pattern if successful, None otherwise
         """
         if not self.client:
             print("Error: Compute Engine client not initialized")
-            return False
+            return None
         
         try:
-            operation = self.client.delete(
+            # Use default config if not provided
+            if vm_config is None:
+                vm_config = config.VM_CONFIGS["standard"]
+            
+            instance_properties = compute_v1.InstanceProperties(
+                machine_type=machine_type,
+                **self._build_instance_properties(vm_config, startup_script)
+            )
+            
+            bulk_resource = compute_v1.BulkInsertInstanceResource(
+                count=count,
+                min_count=count,
+                name_pattern=name_pattern,
+                instance_properties=instance_properties
+            )
+            
+            # Retries reuse the request ID, so GCE deduplicates a lost response
+            request = compute_v1.BulkInsertInstanceRequest(
                 project=self.project_id,
                 zone=self.zone,
-                instance=instance_name
+                bulk_insert_instance_resource_resource=bulk_resource,
+                request_id=str(uuid.uuid4())
             )
+            operation = self.client.bulk_insert(request=request, retry=GCP_RETRY)
             
-            print(f"Deleting VM instance: {instance_name}")
+            print(f"Creating {count} VM instances: {name_pattern}")
+            print(f"Machine type: {machine_type}")
+            print(f"Preemptible: {vm_config.preemptible}")
+            
+            # Wait for the operation to complete
             self._wait_for_operation(operation)
-            print(f"VM instance {instance_name} deleted successfully")
-            return True
+            
+            print(f"VM instances {name_pattern} created successfully")
+            return name_pattern
             
         except Exception as e:
-            print(f"Error deleting VM: {e}")
-            return False
+            print(f"Error creating VMs: {e}")
+            return None
+    
+    def _build_instance_properties(self, vm_config: config.VMConfig, startup_script: str) -> Dict:
+        """
+        Build the instance fields shared by single and bulk VM creation.
+        
+        Args:
+            vm_config: VM configuration (see config.VM_CONFIGS)
+            startup_script: Startup script to run on the VM
+            
+        Returns:
+            Dictionary of keyword arguments for Instance/InstanceProperties
+        """
+        return {
+            # Boot disk
+            "disks": [
+                compute_v1.AttachedDisk(
+                    boot=True,
+                    auto_delete=True,
+                    initialize_params=compute_v1.AttachedDiskInitializeParams(
+                        source_image=_SOURCE_IMAGE,
+                        disk_size_gb=vm_config.boot_disk_size_gb
+                    )
+                )
+            ],
+            "network_interfaces": [_DEFAULT_NETWORK_INTERFACE],
+            # Metadata for startup script
+            "metadata": compute_v1.Metadata(
+                items=[compute_v1.Items(key="startup-script", value=startup_script)]
+            ),
+            # Scheduling configuration (for preemptible VMs)
+            "scheduling": compute_v1.Scheduling(
+                preemptible=vm_config.preemptible,
+                automatic_restart=False,
+                on_host_maintenance="TERMINATE"
+            ),
+            "service_accounts": [_DEFAULT_SERVICE_ACCOUNT],
+            "labels": _INSTANCE_LABELS,
+        }
+    
+    def delete_vm(self, instance_name: str) -> bool:
+        """
+        Delete a VM instance.
+        
+        Args:
+            instance_name: Name of the instance to delete
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.delete_vms([instance_name]).get(instance_name, False)
+    
+    def delete_vms(self, instance_names: List[str]) -> Dict[str, bool]:
+        """
+        Delete several VM instances concurrently.
+        
+        All delete requests are issued before waiting on any of them, so
+        GCE tears the instances down in parallel.
+        
+        Args:
+            instance_names: Names of the instances to delete
+            
+        Returns:
+            Dictionary mapping instance name to True if deleted, False otherwise
+        """
+        results = {name: False for name in instance_names}
+        
+        if not self.client:
+            print("Error: Compute Engine client not initialized")
+            return results
+        
+        operations = {}
+        for instance_name in instance_names:
+            try:
+                # Retries reuse the request ID, so GCE deduplicates a lost response
+                request = compute_v1.DeleteInstanceRequest(
+                    project=self.project_id,
+                    zone=self.zone,
+                    instance=instance_name,
+                    request_id=str(uuid.uuid4())
+                )
+                operations[instance_name] = self.client.delete(request=request, retry=GCP_RETRY)
+                print(f"Deleting VM instance: {instance_name}")
+            except Exception as e:
+                print(f"Error deleting VM {instance_name}: {e}")
+        
+        for instance_name, operation in operations.items():
+            try:
+                self._wait_for_operation(operation)
+                print(f"VM instance {instance_name} deleted successfully")
+                results[instance_name] = True
+            except Exception as e:
+                print(f"Error deleting VM {instance_name}: {e}")
+        
+        return results
     
     def get_instance_status(self, instance_name: str) -> Optional[str]:
         """
@@ -177,38 +417,59 @@ class VMLauncher:
         Returns:
             Instance status or None if not found
         """
-        if not self.client:
-            return None
+        return self.get_instance_statuses([instance_name]).get(instance_name)
+    
+    def get_instance_statuses(self, instance_names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get the status of several VM instances with a single list request.
+        
+        Args:
+            instance_names: Names of the instances
+            
+        Returns:
+            Dictionary mapping instance name to status (None if not found)
+        """
+        statuses = {name: None for name in instance_names}
+        
+        if not self.client or not instance_names:
+            return statuses
         
         try:
-            instance = self.client.get(
+            name_filter = " OR ".join(f'(name = "{name}")' for name in instance_names)
+            request = compute_v1.ListInstancesRequest(
                 project=self.project_id,
                 zone=self.zone,
-                instance=instance_name
+                filter=name_filter
             )
-            return instance.status
+            for instance in self.client.list(request=request, retry=GCP_RETRY):
+                if instance.name in statuses:
+                    statuses[instance.name] = instance.status
         except Exception as e:
             print(f"Error getting instance status: {e}")
-            return None
+        
+        return statuses
     
     def _wait_for_operation(self, operation, timeout: int = 300):
         """
         Wait for a Compute Engine operation to complete.
         
+        The extended operation returned by the Compute client blocks on the
+        zone operations ``wait`` endpoint server-side, so no local polling
+        is needed.
+        
         Args:
-            operation: The operation to wait for
+            operation: The extended operation to wait for
             timeout: Maximum time to wait in seconds
         """
-        start_time = time.time()
+        if operation is None:
+            raise Exception("Operation failed: no operation returned")
         
-        while time.time() - start_time < timeout:
-            if operation.status == compute_v1.Operation.Status.DONE:
-                if operation.error:
-                    raise Exception(f"Operation failed: {operation.error}")
-                return
-            time.sleep(5)
+        operation.result(timeout=timeout)
         
-        raise TimeoutError(f"Operation timed out after {timeout} seconds")
+        if operation.error_code:
+            raise Exception(
+                f"Operation failed: [{operation.error_code}] {operation.error_message}"
+            )
     
     def generate_startup_script(
         self,
@@ -233,81 +494,13 @@ class VMLauncher:
         Returns:
             Startup script as a string
         """
-        bucket_name = config.GCP_BUCKET_NAME
-        
-        # Convert enabled steps to comma-separated list
-        steps_list = [step for step, enabled in enabled_steps.items() if enabled]
-        steps_str = ",".join(steps_list)
-        
-        script = f"""#!/bin/bash
-set -e
-
-# Log all output
-exec > >(tee -a /var/log/startup-script.log)
-exec 2>&1
-
-echo "Starting metagenomics pipeline for job: {job_id}"
-echo "Timestamp: $(date)"
-
-# Update and install dependencies
-apt-get update
-apt-get install -y docker.io git
-
-# Start Docker
-systemctl start docker
-systemctl enable docker
-
-# Clone the repository
-cd /home
-git clone {config.REPOSITORY_URL}
-cd metagenomics
-
-# Build Docker image
-docker build -t metagenomics:latest .
-
-# Install additional tools in container
-docker run --name pipeline -d metagenomics:latest sleep infinity
-docker exec pipeline apt-get update
-docker exec pipeline apt-get install -y seqkit parallel vim google-cloud-sdk
-
-# Create data directory
-docker exec pipeline mkdir -p /data
-
-# Download input files from GCS
-echo "Downloading input files..."
-docker exec pipeline gsutil cp {input_file_1} /data/CV_1.fq.gz
-docker exec pipeline gsutil cp {input_file_2} /data/CV_2.fq.gz
-
-# Run the pipeline
-echo "Running pipeline with parameters:"
-echo "  Threads: {threads}"
-echo "  Min contig length: {min_contig_len}"
-echo "  Enabled steps: {steps_str}"
-
-# Copy pipeline script
-docker cp pipeline/run.sh pipeline:/pipeline/run.sh
-docker exec pipeline chmod +x /pipeline/run.sh
-
-# Execute the pipeline
-docker exec pipeline /pipeline/run.sh \\
-    --threads {threads} \\
-    --min-contig-len {min_contig_len} \\
-    --steps "{steps_str}" \\
-    --job-id {job_id} \\
-    --bucket {bucket_name}
-
-# Upload results to GCS
-echo "Uploading results to GCS..."
-docker exec pipeline gsutil -m cp -r /data/results/* gs://{bucket_name}/results/{job_id}/
-
-# Cleanup
-echo "Pipeline completed successfully"
-echo "Timestamp: $(date)"
-
-# Create completion marker
-echo "DONE" | docker exec -i pipeline gsutil cp - gs://{bucket_name}/jobs/{job_id}/status.txt
-
-# Shutdown the VM
-shutdown -h now
-"""
-        return script
+        return _STARTUP_SCRIPT_TEMPLATE.substitute(
+            job_id=job_id,
+            input_file_1=input_file_1,
+            input_file_2=input_file_2,
+            threads=threads,
+            min_contig_len=min_contig_len,
+            steps=",".join(step for step, enabled in enabled_steps.items() if enabled),
+            bucket_name=config.GCP_BUCKET_NAME,
+            repository_url=config.REPOSITORY_URL,
+        )
@@ -1,20 +1,129 @@
 """Monitor pipeline job status and progress on GCP."""
 import time
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
-from gcp.storage import StorageHandler
+from google.oauth2 import service_account
+from gcp.storage import get_storage_handler
 from gcp.launcher import VMLauncher
 import config
 
 
+# Log markers written by pipeline/run.sh, mapped to their step IDs
+_STEP_MARKERS = {
+    "FastQC": "fastqc",
+    "Trimmomatic": "trimmomatic",
+    "MEGAHIT": "megahit",
+    "Prodigal": "prodigal",
+    "HMMscan": "hmmscan",
+    "MetaBAT2": "binning",
+    "CheckM": "checkm",
+}
+
+_STEP_MARKER_ALTERNATION = "|".join(re.escape(marker) for marker in _STEP_MARKERS)
+_STEP_MARKER_RE = re.compile(
+    rf"Running (?P<started>{_STEP_MARKER_ALTERNATION})"
+    rf"|(?P<completed>{_STEP_MARKER_ALTERNATION}) completed"
+)
+
+
+# Result categories as (substrings, required suffix, result key); first match wins
+_RESULT_CATEGORIES = (
+    (("multiqc",), "", "multiqc_report"),
+    (("contigs",), ".fa", "contigs"),
+    (("pfam", "hmmscan"), "", "pfam_annotations"),
+    (("bins", "metabat"), "", "bins"),
+    (("checkm",), "", "checkm_report"),
+)
+
+
+def _categorize_result(filename: str) -> str:
+    """
+    Map a result filename to its result key.
+    
+    Args:
+        filename: Result file name (without prefix)
+        
+    Returns:
+        Result category key, or the filename itself for generic files
+    """
+    lowered = filename.lower()
+    for substrings, suffix, key in _RESULT_CATEGORIES:
+        if filename.endswith(suffix) and any(sub in lowered for sub in substrings):
+            return key
+    return filename
+
+
 class JobMonitor:
     """Monitor and track pipeline job progress."""
     
     def __init__(self):
         """Initialize the job monitor."""
-        self.storage = StorageHandler()
+        self.storage = get_storage_handler()
         self.vm_launcher = VMLauncher()
+        self._step_state: Dict[str, Dict] = {}  # Per-job incremental log parse state
+        self._step_state_lock = threading.Lock()  # Timer ticks and Refresh clicks poll concurrently
+        self._watched_jobs = set()  # Job IDs polled and not yet finished; the only ones events are kept for
+        self._completed_jobs = set()  # Watched job IDs whose completion marker was announced
+        self._status_subscription = None
+        self._probe_pool = ThreadPoolExecutor(max_workers=4)  # Overlaps VM probes with GCS reads
+        
+        if config.GCS_STATUS_SUBSCRIPTION:
+            self._subscribe_status_events(config.GCS_STATUS_SUBSCRIPTION)
+    
+    def _subscribe_status_events(self, subscription: str):
+        """
+        Listen for GCS object notifications announcing job completion markers.
+        
+        The subscription must receive OBJECT_FINALIZE notifications for the
+        bucket's jobs/ prefix. Messages are handled on a background thread.
+        
+        Args:
+            subscription: Full Pub/Sub subscription path
+                (projects/<project>/subscriptions/<name>)
+        """
+        try:
+            from google.cloud import pubsub_v1
+            
+            if config.GCP_SERVICE_ACCOUNT_KEY:
+                credentials = service_account.Credentials.from_service_account_file(
+                    config.GCP_SERVICE_ACCOUNT_KEY
+                )
+                subscriber = pubsub_v1.SubscriberClient(credentials=credentials)
+            else:
+                # Default credentials
+                subscriber = pubsub_v1.SubscriberClient()
+            self._status_subscription = subscriber.subscribe(
+                subscription,
+                callback=self._on_status_event
+            )
+        except Exception as e:
+            print(f"Warning: Could not subscribe to job status notifications, polling GCS instead: {e}")
+    
+    def _on_status_event(self, message):
+        """
+        Record a job as complete when its status.txt marker is written.
+        
+        Only OBJECT_FINALIZE events in the configured bucket for jobs being
+        watched count; deletes, metadata updates, other users' jobs and
+        events from other buckets sharing the subscription are acknowledged
+        and ignored.
+        
+        Args:
+            message: Pub/Sub message carrying a GCS object notification
+        """
+        object_id = message.attributes.get("objectId", "")
+        parts = object_id.split("/")
+        
+        if (message.attributes.get("eventType") == "OBJECT_FINALIZE"
+                and message.attributes.get("bucketId") == config.GCP_BUCKET_NAME
+                and len(parts) == 3 and parts[0] == "jobs" and parts[2] == "status.txt"
+                and parts[1] in self._watched_jobs):
+            self._completed_jobs.add(parts[1])
+        
+        message.ack()
     
     def get_job_status(self, job_id: str, instance_name: str) -> Dict:
         """
@@ -39,32 +148,46 @@ class JobMonitor:
             "error": None,
         }
         
+        self._watched_jobs.add(job_id)
+        
         try:
-            # Check VM status
-            vm_status = self.vm_launcher.get_instance_status(instance_name)
-            status["vm_status"] = vm_status or "not_found"
+            # Check VM status while the GCS status objects are read
+            vm_future = self._probe_pool.submit(self.vm_launcher.get_instance_status, instance_name)
             
             # Check for completion marker
-            completion_blob = f"jobs/{job_id}/status.txt"
-            blobs = self.storage.list_blobs(prefix=completion_blob)
+            if self._status_subscription is not None:
+                is_complete = job_id in self._completed_jobs
+            else:
+                is_complete = self.storage.blob_exists(f"jobs/{job_id}/status.txt")
+            
+            # Fetch log metadata for progress unless the job is already done
+            log_info = None
+            if not is_complete:
+                log_info = self.storage.get_blob(f"jobs/{job_id}/pipeline.log")
             
-            if blobs:
+            vm_status = vm_future.result()
+            status["vm_status"] = vm_status or "not_found"
+            
+            # The VM shuts down right after writing the marker, so once it has
+            # stopped, confirm against GCS in case the notification was missed,
+            # consumed by another subscriber or sent before this process started
+            if not is_complete and self._status_subscription is not None and vm_status != "RUNNING":
+                is_complete = self.storage.blob_exists(f"jobs/{job_id}/status.txt")
+            
+            if is_complete:
                 status["status"] = "complete"
                 status["progress"] = 100
+                self._forget_job(job_id)
                 return status
             
             # Parse logs for progress
-            log_blob = f"jobs/{job_id}/pipeline.log"
-            blobs = self.storage.list_blobs(prefix=log_blob)
-            
-            if blobs:
-                # Download and parse log
-                local_log = f"/tmp/{job_id}_pipeline.log"
-                if self.storage.download_file(log_blob, local_log):
-                    step_status = self._parse_pipeline_log(local_log)
-                    status["steps"] = step_status
-                    status["current_step"] = self._get_current_step(step_status)
-                    status["progress"] = self._calculate_progress(step_status)
+            if log_info:
+                # Fetch and parse only the bytes appended since the last poll
+                with self._step_state_lock:
+                    step_state = self._parse_pipeline_log(job_id, log_info)
+                    status["steps"] = dict(step_state["steps"])
+                    status["current_step"] = self._get_current_step(step_state)
+                    status["progress"] = self._calculate_progress(step_state)
             
             # Determine overall status
             if vm_status == "RUNNING":
@@ -77,96 +200,167 @@ class JobMonitor:
             elif vm_status == "PROVISIONING" or vm_status == "STAGING":
                 status["status"] = "starting"
             
+            if status["status"] in ("complete", "failed"):
+                self._forget_job(job_id)
+            
         except Exception as e:
             status["error"] = str(e)
             status["status"] = "error"
         
         return status
     
-    def _parse_pipeline_log(self, log_file: str) -> Dict[str, Dict]:
+    def _forget_job(self, job_id: str):
         """
-        Parse the pipeline log file to extract step status.
+        Drop the tracking state of a job that reached a final status.
+        
+        A later poll of the same job simply starts watching it again.
         
         Args:
-            log_file: Path to the log file
+            job_id: Unique job identifier
+        """
+        self._watched_jobs.discard(job_id)
+        self._completed_jobs.discard(job_id)
+        
+        with self._step_state_lock:
+            self._step_state.pop(job_id, None)
+    
+    def _parse_pipeline_log(self, job_id: str, log_info) -> Dict:
+        """
+        Incrementally parse the pipeline log to extract step status.
+        
+        Only bytes past the offset reached on the previous call are
+        downloaded; step statuses, the completed-step count and the current
+        step are updated as markers arrive and kept in the per-job state.
+        run.sh re-uploads the whole log on every line, so a new generation
+        normally extends the previous one and reading continues from the
+        offset. A shorter object means the log was replaced, and it is
+        parsed again from the beginning; markers only move steps forward,
+        so re-reading lines already seen is harmless.
+        
+        Callers must hold _step_state_lock.
+        
+        Args:
+            job_id: Unique job identifier
+            log_info: Blob metadata for the job's pipeline log
             
         Returns:
-            Dictionary of step statuses
+            Per-job step state with "steps", "completed" and "current" keys
         """
-        steps = {}
+        state = self._step_state.get(job_id)
+        if state is None:
+            state = self._step_state[job_id] = {
+                "generation": None,
+                "offset": 0,
+                "partial_line": "",
+                "steps": {
+                    step: {"status": "pending", "progress": 0}
+                    for step in _STEP_MARKERS.values()
+                },
+                "completion_seen": set(),
+                "completed": 0,
+                "current": None,
+            }
         
         try:
-            with open(log_file, 'r') as f:
-                log_content = f.read()
-            
-            # Look for step markers in the log
-            step_patterns = {
-                "fastqc": r"Running FastQC",
-                "trimmomatic": r"Running Trimmomatic",
-                "megahit": r"Running MEGAHIT",
-                "prodigal": r"Running Prodigal",
-                "hmmscan": r"Running HMMscan",
-                "binning": r"Running MetaBAT2",
-                "checkm": r"Running CheckM",
-            }
-            
-            completion_patterns = {
-                "fastqc": r"FastQC completed",
-                "trimmomatic": r"Trimmomatic completed",
-                "megahit": r"MEGAHIT completed",
-                "prodigal": r"Prodigal completed",
-                "hmmscan": r"HMMscan completed",
-                "binning": r"MetaBAT2 completed",
-                "checkm": r"CheckM completed",
-            }
+            if log_info.generation != state["generation"]:
+                state["generation"] = log_info.generation
+                if (log_info.size or 0) < state["offset"]:
+                    state["offset"] = 0
+                    state["partial_line"] = ""
             
-            for step, pattern in step_patterns.items():
-                if re.search(pattern, log_content):
-                    completion_pattern = completion_patterns[step]
-                    if re.search(completion_pattern, log_content):
-                        steps[step] = {"status": "complete", "progress": 100}
-                    else:
-                        steps[step] = {"status": "running", "progress": 50}
-                else:
-                    steps[step] = {"status": "pending", "progress": 0}
+            if (log_info.size or 0) > state["offset"]:
+                new_bytes = self.storage.download_range(
+                    log_info.name,
+                    state["offset"],
+                    generation=log_info.generation
+                )
+                state["offset"] += len(new_bytes)
+                
+                # Hold back a trailing incomplete line until the rest arrives
+                lines = (state["partial_line"] + new_bytes.decode("utf-8", errors="replace")).split("\n")
+                state["partial_line"] = lines.pop()
+                
+                for line in lines:
+                    for match in _STEP_MARKER_RE.finditer(line):
+                        if match.group("started"):
+                            self._mark_step_started(state, _STEP_MARKERS[match.group("started")])
+                        else:
+                            self._mark_step_completed(state, _STEP_MARKERS[match.group("completed")])
         
         except Exception as e:
             print(f"Error parsing log file: {e}")
         
-        return steps
+        return state
+    
+    def _mark_step_started(self, state: Dict, step: str):
+        """
+        Apply a step start marker to the per-job step state.
+        
+        Args:
+            state: Per-job step state
+            step: Step ID that started
+        """
+        if state["steps"][step]["status"] != "pending":
+            return
+        
+        if step in state["completion_seen"]:
+            self._set_step_complete(state, step)
+        else:
+            state["steps"][step] = {"status": "running", "progress": 50}
+            state["current"] = step
     
-    def _get_current_step(self, steps: Dict[str, Dict]) -> Optional[str]:
+    def _mark_step_completed(self, state: Dict, step: str):
+        """
+        Apply a step completion marker to the per-job step state.
+        
+        A completion marker only completes a step that has started.
+        
+        Args:
+            state: Per-job step state
+            step: Step ID that completed
+        """
+        state["completion_seen"].add(step)
+        
+        if state["steps"][step]["status"] == "running":
+            self._set_step_complete(state, step)
+    
+    def _set_step_complete(self, state: Dict, step: str):
+        """
+        Mark a step complete and update the running counters.
+        
+        Args:
+            state: Per-job step state
+            step: Step ID to mark complete
+        """
+        state["steps"][step] = {"status": "complete", "progress": 100}
+        state["completed"] += 1
+        
+        if state["current"] == step:
+            state["current"] = None
+    
+    def _get_current_step(self, state: Dict) -> Optional[str]:
         """
         Determine the current running step.
         
         Args:
-            steps: Dictionary of step statuses
+            state: Per-job step state
             
         Returns:
             Name of the current step or None
         """
-        for step, info in steps.items():
-            if info.get("status") == "running":
-                return step
-        return None
+        return state["current"]
     
-    def _calculate_progress(self, steps: Dict[str, Dict]) -> int:
+    def _calculate_progress(self, state: Dict) -> int:
         """
         Calculate overall progress percentage.
         
         Args:
-            steps: Dictionary of step statuses
+            state: Per-job step state
             
         Returns:
             Progress percentage (0-100)
         """
-        if not steps:
-            return 0
-        
-        total_steps = len(steps)
-        completed_steps = sum(1 for info in steps.values() if info.get("status") == "complete")
-        
-        return int((completed_steps / total_steps) * 100)
+        return int(state["completed"] * 100 / len(_STEP_MARKERS))
     
     def estimate_cost(
         self,
@@ -208,30 +402,24 @@ class JobMonitor:
         try:
             # List all result files
             result_prefix = f"results/{job_id}/"
-            blobs = self.storage.list_blobs(prefix=result_prefix)
+            blobs = self.storage.list_blobs_materialized(prefix=result_prefix)
+            
+            def sign(blob_name: str) -> Optional[str]:
+                return self.storage.generate_signed_url(blob_name, expiration_minutes=120)
+            
+            if self.storage.signs_locally:
+                # Signing with a local key is CPU-only; no round-trips to overlap
+                urls = [sign(blob_name) for blob_name in blobs]
+            else:
+                # Without a local key each signature may need a remote call; overlap them, preserving listing order
+                with ThreadPoolExecutor(max_workers=config.SIGNED_URL_MAX_WORKERS) as executor:
+                    urls = list(executor.map(sign, blobs))
             
             # Categorize results
-            for blob_name in blobs:
-                filename = blob_name.split('/')[-1]
-                
-                # Generate signed URL
-                url = self.storage.generate_signed_url(blob_name, expiration_minutes=120)
-                
+            for blob_name, url in zip(blobs, urls):
                 if url:
-                    # Categorize by file type
-                    if 'multiqc' in filename.lower():
-                        results['multiqc_report'] = url
-                    elif 'contigs' in filename.lower() and filename.endswith('.fa'):
-                        results['contigs'] = url
-                    elif 'pfam' in filename.lower() or 'hmmscan' in filename.lower():
-                        results['pfam_annotations'] = url
-                    elif 'bins' in filename.lower() or 'metabat' in filename.lower():
-                        results['bins'] = url
-                    elif 'checkm' in filename.lower():
-                        results['checkm_report'] = url
-                    else:
-                        # Generic result file
-                        results[filename] = url
+                    filename = blob_name.split('/')[-1]
+                    results[_categorize_result(filename)] = url
         
         except Exception as e:
             print(f"Error getting results: {e}")
@@ -0,0 +1,26 @@
+"""Retry policies shared by GCP API calls."""
+from google.api_core import exceptions
+from google.api_core import retry
+from google.cloud.storage.retry import DEFAULT_RETRY as _STORAGE_DEFAULT_RETRY
+
+# Exponential backoff on transient errors: 2 s initial delay, doubling,
+# capped at 60 s per attempt and 10 minutes overall.
+GCP_RETRY = retry.Retry(
+    initial=2.0,
+    maximum=60.0,
+    multiplier=2.0,
+    timeout=600.0,
+    predicate=retry.if_exception_type(
+        exceptions.InternalServerError,
+        exceptions.ServiceUnavailable,
+        exceptions.TooManyRequests,
+    ),
+)
+
+# Same backoff for Cloud Storage, keeping the storage library's predicate, which
+# also retries 502/504 responses and connection, timeout and transport errors.
+GCS_RETRY = _STORAGE_DEFAULT_RETRY.with_delay(
+    initial=2.0,
+    maximum=60.0,
+    multiplier=2.0,
+).with_timeout(600.0)
@@ -1,16 +1,174 @@
 """Google Cloud Storage handler for uploading and downloading files."""
+import functools
+import itertools
+import logging
+import mmap
 import os
+import re
+import socket
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Callable, Iterator, Optional
+from google.api_core.exceptions import BadRequest, NotFound
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from gcp.retry import GCS_RETRY
+import google_crc32c
 import config
 
+log = logging.getLogger(__name__)
+
+
+# Upload checksums use google-crc32c; without its C extension (SSE4.2 CRC
+# instructions) hashing multi-GB FASTQ files falls back to pure Python.
+if google_crc32c.implementation != "c":
+    log.warning("google-crc32c C extension not available; upload checksums will be slow")
+
+# Objects per list request (the API maximum)
+_LIST_PAGE_SIZE = 1000
+
+# GCS accepts at most 100 calls per batch request
+_BATCH_MAX_REQUESTS = 100
+
+# Default extensions when listing FASTQ inputs
+_DEFAULT_FASTQ_EXTS = (".fq.gz", ".fastq.gz")
+
+# GCS composes at most 32 source objects per request
+_COMPOSE_MAX_COMPONENTS = 32
+
+# Temporary part objects of composite uploads; a bucket lifecycle rule on this
+# prefix removes parts orphaned by a process that died mid-upload (see README)
+_UPLOAD_PARTS_PREFIX = "tmp/upload-parts/"
+
+# Pooled connections per host; covers concurrent chunk transfers and URL signing
+_HTTP_POOL_SIZE = 32
+
+# Local write buffer for single-stream downloads
+_DOWNLOAD_WRITE_BUFFER_BYTES = 8 * 1024 * 1024
+
+# Kernel TCP send buffer for GCS connections, sized for high bandwidth-delay uploads
+_SOCKET_SEND_BUFFER_BYTES = 4 * 1024 * 1024
+
+
+class _StorageHTTPAdapter(HTTPAdapter):
+    """HTTP adapter with a pool sized for concurrent transfers and large send buffers."""
+    
+    def __init__(self):
+        super().__init__(
+            pool_connections=_HTTP_POOL_SIZE,
+            pool_maxsize=_HTTP_POOL_SIZE,
+            max_retries=3
+        )
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_SNDBUF, _SOCKET_SEND_BUFFER_BYTES),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+class _ProgressReader:
+    """File wrapper that reports the read position to a progress callback."""
+    
+    def __init__(self, file_obj, total_bytes: int, callback: Callable[[int, int], None]):
+        self._file_obj = file_obj
+        self._total_bytes = total_bytes
+        self._callback = callback
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._file_obj.read(size)
+        self._callback(self._file_obj.tell(), self._total_bytes)
+        return data
+    
+    def __getattr__(self, name):
+        return getattr(self._file_obj, name)
+
+
+class _FileWindow:
+    """Seekable read-only view of a byte range of a memory-mapped file."""
+    
+    def __init__(self, mapped: mmap.mmap, start: int, length: int):
+        self._mapped = mapped
+        self._start = start
+        self._length = length
+        self._pos = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        end = self._length if size is None or size < 0 else min(self._pos + size, self._length)
+        end = max(end, self._pos)
+        data = self._mapped[self._start + self._pos:self._start + end]
+        self._pos = end
+        return data
+    
+    def tell(self) -> int:
+        return self._pos
+    
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._pos, os.SEEK_END: self._length}[whence]
+        self._pos = base + offset
+        return self._pos
+
+
+@functools.lru_cache(maxsize=1)
+def _load_service_account_credentials(service_account_key: str) -> service_account.Credentials:
+    """
+    Load service account credentials once per process.
+    
+    The parsed private key doubles as the signer for signed URLs.
+    
+    Args:
+        service_account_key: Path to a service account key file
+        
+    Returns:
+        Service account credentials
+    """
+    return service_account.Credentials.from_service_account_file(service_account_key)
+
+
+# Clients created by _get_storage_client, closed by shutdown()
+_open_clients = []
+
+
+@functools.lru_cache(maxsize=1)
+def _get_storage_client(project_id: str, service_account_key: str = "") -> storage.Client:
+    """
+    Get the process-wide GCS client, creating it on first use.
+    
+    Args:
+        project_id: GCP project ID
+        service_account_key: Optional path to a service account key file
+        
+    Returns:
+        Shared storage client
+    """
+    if service_account_key:
+        credentials = _load_service_account_credentials(service_account_key)
+        client = storage.Client(project=project_id, credentials=credentials)
+    else:
+        # Default credentials
+        client = storage.Client(project=project_id)
+    
+    client._http.mount("https://", _StorageHTTPAdapter())
+    _open_clients.append(client)
+    return client
+
 
 class StorageHandler:
-    """Handle file operations with Google Cloud Storage."""
+    """
+    Handle file operations with Google Cloud Storage.
+    
+    All handlers share one process-wide client and connection pool, and a
+    handler is safe to share across threads.
+    """
+    
+    __slots__ = ("project_id", "bucket_name", "client", "bucket", "_signing_credentials", "_bucket_cache")
     
     def __init__(self):
         """Initialize the GCS client."""
@@ -18,91 +176,196 @@ class StorageHandler:
         self.bucket_name = config.GCP_BUCKET_NAME
         self.client = None
         self.bucket = None
+        self._signing_credentials = None
+        self._bucket_cache = {}  # Bucket handles for buckets other than the configured one
         
         if config.GCP_SERVICE_ACCOUNT_KEY and os.path.exists(config.GCP_SERVICE_ACCOUNT_KEY):
-            credentials = service_account.Credentials.from_service_account_file(
+            self._signing_credentials = _load_service_account_credentials(
                 config.GCP_SERVICE_ACCOUNT_KEY
             )
-            self.client = storage.Client(
-                project=self.project_id,
-                credentials=credentials
+            self.client = _get_storage_client(
+                self.project_id,
+                config.GCP_SERVICE_ACCOUNT_KEY
             )
         elif config.GCP_PROJECT_ID:
             # Try default credentials
             try:
-                self.client = storage.Client(project=self.project_id)
+                self.client = _get_storage_client(self.project_id)
             except Exception as e:
-                print(f"Warning: Could not initialize GCS client: {e}")
+                log.warning("Could not initialize GCS client: %s", e)
         
         if self.client and self.bucket_name:
             try:
                 self.bucket = self.client.bucket(self.bucket_name)
             except Exception as e:
-                print(f"Warning: Could not access bucket {self.bucket_name}: {e}")
+                log.warning("Could not access bucket %s: %s", self.bucket_name, e)
+    
+    def close(self):
+        """
+        Release this handler's client and bucket handles.
+        
+        The shared client stays open for other handlers; shutdown() closes
+        it at process exit.
+        """
+        if get_storage_handler.cache_info().currsize and get_storage_handler() is self:
+            # Don't hand this closed handler out to later callers
+            get_storage_handler.cache_clear()
+        
+        self.client = None
+        self.bucket = None
+        self._signing_credentials = None
+        self._bucket_cache.clear()
     
     def upload_file(
         self,
         local_path: str,
         blob_name: str,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        if_generation_match: Optional[int] = 0,
+        cache_control: Optional[str] = None
     ) -> Optional[str]:
         """
         Upload a file to GCS with progress tracking.
         
+        Files larger than CHUNK_SIZE_MB are uploaded concurrently as
+        temporary part objects and composed server-side; progress is
+        reported as each part's chunks are sent.
+        
         Args:
             local_path: Path to the local file
             blob_name: Name of the blob in GCS
             progress_callback: Optional callback function(bytes_uploaded, total_bytes)
+            if_generation_match: Upload precondition that makes retries safe.
+                0 (default) only creates a new object; pass the current
+                generation to replace an object, or None to overwrite
+                unconditionally. For concurrent uploads it applies to the
+                compose request that writes the destination object
+            cache_control: Optional Cache-Control metadata for the object,
+                e.g. "no-cache" for status files that change in place
             
         Returns:
             GCS URI of the uploaded file or None if failed
         """
         if not self.bucket:
-            print("Error: GCS bucket not initialized")
+            log.error("GCS bucket not initialized")
             return None
             
         try:
             local_path = Path(local_path)
             if not local_path.exists():
-                print(f"Error: File not found: {local_path}")
+                log.error("File not found: %s", local_path)
                 return None
             
             file_size = local_path.stat().st_size
             blob = self.bucket.blob(blob_name)
+            if cache_control:
+                # Sent as object metadata with the upload itself
+                blob.cache_control = cache_control
             
             # For large files, use chunked upload
             chunk_size = config.CHUNK_SIZE_MB * 1024 * 1024  # Convert to bytes
             
             if file_size > chunk_size:
-                # Chunked upload with progress tracking
-                with open(local_path, 'rb') as file_obj:
-                    bytes_uploaded = 0
-                    while True:
-                        chunk = file_obj.read(chunk_size)
-                        if not chunk:
-                            break
-                        
-                        bytes_uploaded += len(chunk)
-                        
-                        if progress_callback:
-                            progress_callback(bytes_uploaded, file_size)
-                    
-                # Actually upload the file
-                blob.upload_from_filename(str(local_path))
+                # Upload chunks in parallel and compose server-side
+                self._upload_composite(
+                    local_path, blob, file_size, chunk_size, if_generation_match, progress_callback
+                )
             else:
                 # Simple upload for smaller files
-                blob.upload_from_filename(str(local_path))
-                if progress_callback:
-                    progress_callback(file_size, file_size)
+                blob.upload_from_filename(
+                    str(local_path),
+                    checksum="crc32c",
+                    if_generation_match=if_generation_match,
+                    retry=GCS_RETRY
+                )
+            
+            if progress_callback:
+                progress_callback(file_size, file_size)
             
             gcs_uri = f"gs://{self.bucket_name}/{blob_name}"
-            print(f"Uploaded {local_path.name} to {gcs_uri}")
+            log.info("Uploaded %s to %s", local_path.name, gcs_uri)
             return gcs_uri
             
         except Exception as e:
-            print(f"Error uploading file: {e}")
+            log.error("Error uploading file: %s", e)
             return None
     
+    def _upload_composite(
+        self,
+        local_path: Path,
+        blob: storage.Blob,
+        file_size: int,
+        part_size: int,
+        if_generation_match: Optional[int],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ):
+        """
+        Upload a file as parallel part objects composed into the destination.
+        
+        Parts are uploaded under _UPLOAD_PARTS_PREFIX with a unique name and
+        deleted afterwards. They are always new objects, so their uploads are
+        retried safely; the precondition is applied to the compose request,
+        the only one that writes the destination.
+        
+        Args:
+            local_path: Path to the local file
+            blob: Destination blob
+            file_size: Size of the local file in bytes
+            part_size: Minimum part size in bytes, raised as needed to stay
+                within the compose component limit
+            if_generation_match: Precondition for the composed object
+            progress_callback: Optional callback function(bytes_uploaded, total_bytes),
+                called with the bytes sent across all parts
+        """
+        part_size = max(part_size, -(file_size // -_COMPOSE_MAX_COMPONENTS))  # Ceiling division
+        part_starts = range(0, file_size, part_size)
+        part_prefix = f"{_UPLOAD_PARTS_PREFIX}{uuid.uuid4().hex}/"
+        part_blobs = [self.bucket.blob(f"{part_prefix}{index}") for index in range(len(part_starts))]
+        part_progress = [0] * len(part_starts)  # Bytes sent per part
+        progress_lock = threading.Lock()
+        
+        try:
+            with open(local_path, 'rb') as file_obj, \
+                    mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(file_obj.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                
+                def upload_part(index: int, part_blob: storage.Blob, start: int):
+                    length = min(part_size, file_size - start)
+                    reader = _FileWindow(mapped, start, length)
+                    
+                    if progress_callback:
+                        def report(part_bytes: int, _part_total: int):
+                            with progress_lock:
+                                part_progress[index] = part_bytes
+                                progress_callback(sum(part_progress), file_size)
+                        
+                        reader = _ProgressReader(reader, length, report)
+                    
+                    part_blob.upload_from_file(
+                        reader,
+                        size=length,
+                        checksum="crc32c",
+                        if_generation_match=0,
+                        retry=GCS_RETRY
+                    )
+                
+                with ThreadPoolExecutor(max_workers=config.TRANSFER_MAX_WORKERS) as executor:
+                    list(executor.map(upload_part, range(len(part_blobs)), part_blobs, part_starts))
+            
+            if blob.content_type is None:
+                # Compose takes the destination's metadata as-is, with no content sniffing
+                blob.content_type = "application/octet-stream"
+            blob.compose(part_blobs, if_generation_match=if_generation_match, retry=GCS_RETRY)
+        finally:
+            try:
+                # Parts that were never uploaded just fail with 404 inside the batch
+                with self.client.batch(raise_exception=False):
+                    for part_blob in part_blobs:
+                        part_blob.delete()
+            except Exception as e:
+                log.warning("Could not delete upload parts %s*: %s", part_prefix, e)
+    
     def download_file(
         self,
         blob_name: str,
@@ -121,33 +384,76 @@ class StorageHandler:
             True if successful, False otherwise
         """
         if not self.bucket:
-            print("Error: GCS bucket not initialized")
+            log.error("GCS bucket not initialized")
             return False
             
         try:
-            blob = self.bucket.blob(blob_name)
+            # Fetch metadata (size) in the same request that checks existence
+            blob = self.bucket.get_blob(blob_name, retry=GCS_RETRY)
             
-            if not blob.exists():
-                print(f"Error: Blob not found: {blob_name}")
+            if blob is None:
+                log.error("Blob not found: %s", blob_name)
                 return False
             
             # Create parent directory if it doesn't exist
             Path(local_path).parent.mkdir(parents=True, exist_ok=True)
             
-            # Download the file
-            blob.download_to_filename(local_path)
+            # Download the file, fetching byte ranges in parallel for large blobs
+            chunk_size = config.DOWNLOAD_CHUNK_SIZE_MB * 1024 * 1024  # Convert to bytes
+            
+            if (blob.size or 0) > chunk_size:
+                transfer_manager.download_chunks_concurrently(
+                    blob,
+                    local_path,
+                    chunk_size=chunk_size,
+                    worker_type=transfer_manager.THREAD,
+                    max_workers=config.TRANSFER_MAX_WORKERS
+                )
+            else:
+                # Large write buffer keeps write() calls few on network filesystems
+                with open(local_path, 'wb', buffering=_DOWNLOAD_WRITE_BUFFER_BYTES) as file_obj:
+                    blob.download_to_file(file_obj, retry=GCS_RETRY)
             
             if progress_callback:
                 file_size = Path(local_path).stat().st_size
                 progress_callback(file_size, file_size)
             
-            print(f"Downloaded {blob_name} to {local_path}")
+            log.info("Downloaded %s to %s", blob_name, local_path)
             return True
             
         except Exception as e:
-            print(f"Error downloading file: {e}")
+            log.error("Error downloading file: %s", e)
             return False
     
+    def download_range(
+        self,
+        blob_name: str,
+        start_byte: int = 0,
+        generation: Optional[int] = None
+    ) -> bytes:
+        """
+        Download the bytes of a blob from an offset to the end.
+        
+        Args:
+            blob_name: Name of the blob in GCS
+            start_byte: Offset of the first byte to download
+            generation: Optional object generation to read from
+            
+        Returns:
+            Downloaded bytes (empty if nothing past the offset)
+        """
+        if not self.bucket:
+            log.error("GCS bucket not initialized")
+            return b""
+        
+        blob = self.bucket.blob(blob_name, generation=generation)
+        return blob.download_as_bytes(start=start_byte, retry=GCS_RETRY)
+    
+    @property
+    def signs_locally(self) -> bool:
+        """Whether signed URLs are signed with a local key, without an IAM API call."""
+        return self._signing_credentials is not None
+    
     def generate_signed_url(
         self,
         blob_name: str,
@@ -164,27 +470,72 @@ class StorageHandler:
             Signed URL or None if failed
         """
         if not self.bucket:
-            print("Error: GCS bucket not initialized")
+            log.error("GCS bucket not initialized")
             return None
             
         try:
             blob = self.bucket.blob(blob_name)
             
+            signing_kwargs = {}
+            if self._signing_credentials is not None:
+                # Sign with the already-parsed key instead of resolving credentials per call
+                signing_kwargs = {
+                    "credentials": self._signing_credentials,
+                    "service_account_email": self._signing_credentials.service_account_email,
+                }
+            
             url = blob.generate_signed_url(
                 version="v4",
                 expiration=timedelta(minutes=expiration_minutes),
                 method="GET",
+                **signing_kwargs
             )
             
             return url
             
         except Exception as e:
-            print(f"Error generating signed URL: {e}")
+            log.error("Error generating signed URL: %s", e)
             return None
     
-    def list_blobs(self, prefix: str = "") -> list:
+    def list_blobs(
+        self,
+        prefix: str = "",
+        max_results: Optional[int] = None,
+        page_size: int = _LIST_PAGE_SIZE
+    ) -> Iterator[str]:
         """
-        List all blobs with a given prefix.
+        Lazily list blob names with a given prefix.
+        
+        Only object names are requested from the API, and names are yielded
+        page by page as the listing proceeds.
+        
+        Args:
+            prefix: Prefix to filter blobs
+            max_results: Optional maximum number of names to return
+            page_size: Number of names to request per page
+            
+        Returns:
+            Iterator of blob names
+        """
+        if not self.bucket:
+            return
+            
+        try:
+            blobs = self.bucket.list_blobs(
+                prefix=prefix,
+                max_results=max_results,
+                page_size=page_size,
+                fields="items(name),nextPageToken",
+                retry=GCS_RETRY
+            )
+            for blob in blobs:
+                yield blob.name
+        except Exception as e:
+            log.error("Error listing blobs: %s", e)
+    
+    def list_blobs_materialized(self, prefix: str = "") -> list:
+        """
+        List all blob names with a given prefix.
         
         Args:
             prefix: Prefix to filter blobs
@@ -192,15 +543,45 @@ class StorageHandler:
         Returns:
             List of blob names
         """
+        return list(self.list_blobs(prefix=prefix))
+    
+    def blob_exists(self, blob_name: str) -> bool:
+        """
+        Check whether a blob exists in GCS.
+        
+        Args:
+            blob_name: Name of the blob in GCS
+            
+        Returns:
+            True if the blob exists, False otherwise
+        """
+        if not self.bucket:
+            return False
+            
+        try:
+            return self.bucket.blob(blob_name).exists(retry=GCS_RETRY)
+        except Exception as e:
+            log.error("Error checking blob: %s", e)
+            return False
+    
+    def get_blob(self, blob_name: str) -> Optional[storage.Blob]:
+        """
+        Fetch a blob along with its metadata (size, generation, ...).
+        
+        Args:
+            blob_name: Name of the blob in GCS
+            
+        Returns:
+            Blob with metadata loaded, or None if not found
+        """
         if not self.bucket:
-            return []
+            return None
             
         try:
-            blobs = self.bucket.list_blobs(prefix=prefix)
-            return [blob.name for blob in blobs]
+            return self.bucket.get_blob(blob_name, retry=GCS_RETRY)
         except Exception as e:
-            print(f"Error listing blobs: {e}")
-            return []
+            log.error("Error getting blob: %s", e)
+            return None
     
     def delete_blob(self, blob_name: str) -> bool:
         """
@@ -217,66 +598,163 @@ class StorageHandler:
             
         try:
             blob = self.bucket.blob(blob_name)
-            blob.delete()
-            print(f"Deleted {blob_name}")
+            blob.delete(retry=GCS_RETRY)
+            log.info("Deleted %s", blob_name)
             return True
         except Exception as e:
-            print(f"Error deleting blob: {e}")
+            log.error("Error deleting blob: %s", e)
             return False
     
     def list_gcs_files(
         self,
         bucket_name: str,
         prefix: str = "",
-        file_extensions: list = None
-    ) -> list:
+        file_extensions: tuple = _DEFAULT_FASTQ_EXTS,
+        max_results: Optional[int] = None,
+        path_filter: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[dict]:
         """
-        List files in a GCS bucket matching the given extensions.
+        Lazily list files in a GCS bucket matching the given extensions.
+        
+        Filtering happens as each page arrives, and listing stops once
+        max_results matches have been found.
         
         Args:
             bucket_name: Name of the GCS bucket
             prefix: Prefix to filter files (e.g., 'samples/')
-            file_extensions: List of file extensions to filter (e.g., ['.fq.gz', '.fastq.gz'])
+            file_extensions: File extensions to filter (e.g., ('.fq.gz', '.fastq.gz'))
+            max_results: Optional maximum number of files to return
+            path_filter: Optional extra predicate on the object name
             
         Returns:
-            List of dicts with: name, path, size, size_human_readable
+            Iterator of dicts with: name, path, size, size_human_readable, created, updated
         """
-        if file_extensions is None:
-            file_extensions = [".fq.gz", ".fastq.gz"]
+        extensions = tuple(file_extensions)
         
-        files = []
+        def matches(name: str) -> bool:
+            return name.endswith(extensions) and (path_filter is None or path_filter(name))
         
         try:
             # Get the bucket
-            if bucket_name and bucket_name != self.bucket_name:
-                bucket = self.client.bucket(bucket_name)
-            elif self.bucket:
-                bucket = self.bucket
-            else:
-                print("Error: No bucket available")
-                return []
+            bucket = self._get_bucket(bucket_name)
+            if bucket is None:
+                log.error("No bucket available")
+                return
+            
+            # Filter by extension server-side where possible
+            match_glob = "**{" + ",".join(extensions) + "}"
+            yield from itertools.islice(
+                self._iter_matching_files_fanout(bucket, prefix, matches, match_glob, max_results),
+                max_results
+            )
+        
+        except Exception as e:
+            log.error("Error listing GCS files: %s", e)
+    
+    def _iter_matching_files_fanout(
+        self,
+        bucket: storage.Bucket,
+        prefix: str,
+        matches: Callable[[str], bool],
+        match_glob: Optional[str] = None,
+        max_results: Optional[int] = None
+    ) -> Iterator[dict]:
+        """
+        List matching files with one concurrent listing per sub-prefix.
+        
+        A delimited listing returns the files directly under the prefix
+        along with its "subdirectories", which are then listed in parallel
+        and merged in name order.
+        
+        Args:
+            bucket: Bucket to list
+            prefix: Prefix to filter files
+            matches: Predicate on object names selecting the files to keep
+            match_glob: Optional glob applied server-side within each sub-prefix;
+                dropped for a sub-prefix if the server rejects it
+            max_results: Optional limit on matches listed per sub-prefix
             
-            # List blobs with prefix
-            blobs = bucket.list_blobs(prefix=prefix)
+        Returns:
+            Iterator of dicts with: name, path, size, size_human_readable, created, updated
+        """
+        top_level = bucket.list_blobs(
+            prefix=prefix,
+            delimiter="/",
+            page_size=_LIST_PAGE_SIZE,
+            fields="items(name,size,timeCreated,updated),prefixes,nextPageToken",
+            retry=GCS_RETRY
+        )
+        yield from _matching_file_infos(top_level, matches)
+        
+        # Sub-prefixes are only known once the delimited listing is consumed
+        sub_prefixes = sorted(top_level.prefixes)
+        if not sub_prefixes:
+            return
+        
+        def list_sub_prefix(sub_prefix: str) -> list:
+            # Later pages are only fetched while fewer than max_results matched
+            try:
+                files = self._iter_matching_files(bucket, sub_prefix, matches, match_glob)
+                return list(itertools.islice(files, max_results))
+            except BadRequest:
+                # Glob rejected; list everything under the sub-prefix instead
+                files = self._iter_matching_files(bucket, sub_prefix, matches)
+                return list(itertools.islice(files, max_results))
+        
+        executor = ThreadPoolExecutor(max_workers=min(config.LIST_MAX_WORKERS, len(sub_prefixes)))
+        try:
+            for files in executor.map(list_sub_prefix, sub_prefixes):
+                yield from files
+        finally:
+            # Don't start listings nobody will read if the caller stopped early
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _iter_matching_files(
+        self,
+        bucket: storage.Bucket,
+        prefix: str,
+        matches: Callable[[str], bool],
+        match_glob: Optional[str] = None
+    ) -> Iterator[dict]:
+        """
+        Lazily list files under a prefix whose names satisfy a predicate.
+        
+        Args:
+            bucket: Bucket to list
+            prefix: Prefix to filter files
+            matches: Predicate on object names selecting the files to keep
+            match_glob: Optional glob applied server-side to object names
             
-            for blob in blobs:
-                # Skip directories
-                if blob.name.endswith('/'):
-                    continue
-                
-                # Check if file matches any of the extensions
-                if any(blob.name.endswith(ext) for ext in file_extensions):
-                    files.append({
-                        'name': blob.name.split('/')[-1],
-                        'path': blob.name,
-                        'size': blob.size,
-                        'size_human_readable': format_file_size(blob.size)
-                    })
+        Returns:
+            Iterator of dicts with: name, path, size, size_human_readable, created, updated
+        """
+        # List blobs with prefix, fetching only the fields used below
+        blobs = bucket.list_blobs(
+            prefix=prefix,
+            match_glob=match_glob,
+            page_size=_LIST_PAGE_SIZE,
+            fields="items(name,size,timeCreated,updated),nextPageToken",
+            retry=GCS_RETRY
+        )
+        return _matching_file_infos(blobs, matches)
+    
+    def _get_bucket(self, bucket_name: str) -> Optional[storage.Bucket]:
+        """
+        Get a bucket handle, reusing handles created by earlier calls.
         
-        except Exception as e:
-            print(f"Error listing GCS files: {e}")
+        Args:
+            bucket_name: Name of the GCS bucket (empty for the configured bucket)
+            
+        Returns:
+            Bucket handle or None if unavailable
+        """
+        if not bucket_name or bucket_name == self.bucket_name:
+            return self.bucket
         
-        return files
+        bucket = self._bucket_cache.get(bucket_name)
+        if bucket is None and self.client:
+            bucket = self._bucket_cache[bucket_name] = self.client.bucket(bucket_name)
+        return bucket
     
     def get_gcs_file_info(self, bucket_name: str, file_path: str) -> dict:
         """
@@ -291,36 +769,144 @@ class StorageHandler:
         """
         try:
             # Get the bucket
-            if bucket_name and bucket_name != self.bucket_name:
-                bucket = self.client.bucket(bucket_name)
-            elif self.bucket:
-                bucket = self.bucket
-            else:
-                print("Error: No bucket available")
+            bucket = self._get_bucket(bucket_name)
+            if bucket is None:
+                log.error("No bucket available")
                 return {}
             
-            # Get blob
+            # Get blob with its latest metadata
             blob = bucket.blob(file_path)
             
-            if not blob.exists():
-                print(f"Error: File not found: {file_path}")
+            try:
+                blob.reload(retry=GCS_RETRY)
+            except NotFound:
+                log.error("File not found: %s", file_path)
                 return {}
             
-            # Reload to get latest metadata
-            blob.reload()
-            
-            return {
-                'name': blob.name.split('/')[-1],
-                'path': blob.name,
-                'size': blob.size,
-                'size_human_readable': format_file_size(blob.size),
-                'created': blob.time_created,
-                'updated': blob.updated
-            }
+            return get_gcs_file_info_from_blob(blob)
         
         except Exception as e:
-            print(f"Error getting file info: {e}")
+            log.error("Error getting file info: %s", e)
             return {}
+    
+    def get_gcs_files_info(self, bucket_name: str, file_paths: list) -> list:
+        """
+        Get metadata for several files in GCS using batched requests.
+        
+        Metadata lookups are grouped into batch requests of up to
+        _BATCH_MAX_REQUESTS each, instead of one HTTP round-trip per file.
+        
+        Args:
+            bucket_name: Name of the GCS bucket
+            file_paths: Full paths to the files in the bucket
+            
+        Returns:
+            List of dicts (see get_gcs_file_info) for the files that exist
+        """
+        files = []
+        
+        try:
+            # Get the bucket
+            bucket = self._get_bucket(bucket_name)
+            if bucket is None:
+                log.error("No bucket available")
+                return []
+            
+            blobs = [bucket.blob(file_path) for file_path in file_paths]
+            
+            for start in range(0, len(blobs), _BATCH_MAX_REQUESTS):
+                # Metadata is populated on each blob when the batch is sent
+                with self.client.batch(raise_exception=False):
+                    for blob in blobs[start:start + _BATCH_MAX_REQUESTS]:
+                        blob.reload()
+            
+            for blob in blobs:
+                # Lookups that failed (e.g. not found) leave the metadata empty
+                if blob.generation is None:
+                    log.error("File not found: %s", blob.name)
+                    continue
+                
+                files.append(get_gcs_file_info_from_blob(blob))
+        
+        except Exception as e:
+            log.error("Error getting file info: %s", e)
+        
+        return files
+
+
+@functools.lru_cache(maxsize=1)
+def get_storage_handler() -> StorageHandler:
+    """
+    Get the process-wide storage handler, creating it on first use.
+    
+    Returns:
+        Shared StorageHandler instance
+    """
+    return StorageHandler()
+
+
+def shutdown():
+    """
+    Close the process-wide GCS clients' HTTP sessions (e.g. at process exit).
+    
+    Handlers created before the call must not be used afterwards; later
+    calls to get_storage_handler() start with a fresh client.
+    """
+    get_storage_handler.cache_clear()
+    _get_storage_client.cache_clear()
+    
+    while _open_clients:
+        _open_clients.pop().close()
+
+
+def get_gcs_file_info_from_blob(blob: storage.Blob) -> dict:
+    """
+    Build file metadata from a blob whose properties are already loaded.
+    
+    Makes no API calls, so blobs returned by a listing can be described
+    without a reload per file.
+    
+    Args:
+        blob: Blob with name, size, timeCreated and updated populated
+        
+    Returns:
+        Dict with: name, path, size, size_human_readable, created, updated
+    """
+    return {
+        'name': blob.name.rpartition('/')[2],
+        'path': blob.name,
+        'size': blob.size,
+        'size_human_readable': format_file_size(blob.size),
+        'created': blob.time_created,
+        'updated': blob.updated
+    }
+
+
+def _matching_file_infos(blobs, matches: Callable[[str], bool]) -> Iterator[dict]:
+    """
+    Yield file info dicts for listed blobs whose names satisfy a predicate.
+    
+    Args:
+        blobs: Iterable of blobs with name, size, timeCreated and updated populated
+        matches: Predicate on object names selecting the files to keep
+        
+    Returns:
+        Iterator of dicts with: name, path, size, size_human_readable, created, updated
+    """
+    for blob in blobs:
+        # Skip directories
+        if blob.name.endswith('/'):
+            continue
+        
+        # Check if file matches the extensions and any extra filter
+        if matches(blob.name):
+            yield get_gcs_file_info_from_blob(blob)
+
+
+# Paired-end read names: <base>_R1 / <base>_1 / <base>.1 directly before a FASTQ
+# extension (e.g. sample_R1.fq.gz, sample.2.fastq); the base is greedy so mate-like
+# tokens inside it (lib.2.x_R1.fq.gz) are left alone
+_PAIRED_READ_RE = re.compile(r'^(?P<base>.+)(?P<sep>_R|_|\.)(?P<mate>[12])(?P<ext>\.f(?:ast)?q(?:\.gz)?)$')
 
 
 def validate_paired_files(file_list: list) -> tuple:
@@ -345,88 +931,29 @@ def validate_paired_files(file_list: list) -> tuple:
     # Get both files
     file1, file2 = file_list[0], file_list[1]
     
-    # Extract base names without extensions
-    base1 = file1.replace('.fq.gz', '').replace('.fastq.gz', '').replace('.fq', '').replace('.fastq', '')
-    base2 = file2.replace('.fq.gz', '').replace('.fastq.gz', '').replace('.fq', '').replace('.fastq', '')
-    
-    # Check various paired-end patterns
-    patterns_valid = False
-    forward_file = None
-    reverse_file = None
-    
-    # Pattern 1: _R1 / _R2 (check for exact _R1/_R2 first, more specific)
-    if (base1.endswith('_R1') and base2.endswith('_R2')):
-        base1_prefix = base1.rsplit('_', 1)[0]
-        base2_prefix = base2.rsplit('_', 1)[0]
-        if base1_prefix == base2_prefix:
-            patterns_valid = True
-            forward_file = file1
-            reverse_file = file2
-    elif (base2.endswith('_R1') and base1.endswith('_R2')):
-        base1_prefix = base1.rsplit('_', 1)[0]
-        base2_prefix = base2.rsplit('_', 1)[0]
-        if base1_prefix == base2_prefix:
-            patterns_valid = True
-            forward_file = file2
-            reverse_file = file1
-    
-    # Pattern 2: _1 / _2 (if _R1/_R2 didn't match)
-    elif (base1.endswith('_1') and base2.endswith('_2')):
-        base1_prefix = base1.rsplit('_', 1)[0]
-        base2_prefix = base2.rsplit('_', 1)[0]
-        if base1_prefix == base2_prefix:
-            patterns_valid = True
-            forward_file = file1
-            reverse_file = file2
-    elif (base2.endswith('_1') and base1.endswith('_2')):
-        base1_prefix = base1.rsplit('_', 1)[0]
-        base2_prefix = base2.rsplit('_', 1)[0]
-        if base1_prefix == base2_prefix:
-            patterns_valid = True
-            forward_file = file2
-            reverse_file = file1
-    
-    # Pattern 3: _1. / _2.
-    elif '_1.' in file1 and '_2.' in file2:
-        base1_prefix = file1.split('_1.')[0]
-        base2_prefix = file2.split('_2.')[0]
-        if base1_prefix == base2_prefix:
-            patterns_valid = True
-            forward_file = file1
-            reverse_file = file2
-    elif '_1.' in file2 and '_2.' in file1:
-        base1_prefix = file1.split('_2.')[0]
-        base2_prefix = file2.split('_1.')[0]
-        if base1_prefix == base2_prefix:
-            patterns_valid = True
-            forward_file = file2
-            reverse_file = file1
-    
-    # Pattern 4: .1. / .2.
-    elif '.1.' in file1 and '.2.' in file2:
-        base1_prefix = file1.split('.1.')[0]
-        base2_prefix = file2.split('.2.')[0]
-        if base1_prefix == base2_prefix:
-            patterns_valid = True
-            forward_file = file1
-            reverse_file = file2
-    elif '.1.' in file2 and '.2.' in file1:
-        base1_prefix = file1.split('.2.')[0]
-        base2_prefix = file2.split('.1.')[0]
-        if base1_prefix == base2_prefix:
-            patterns_valid = True
-            forward_file = file2
-            reverse_file = file1
+    match1 = _PAIRED_READ_RE.match(os.path.basename(file1))
+    match2 = _PAIRED_READ_RE.match(os.path.basename(file2))
+    
+    # Same directory, sample name, naming style and extension, one forward (1) and one reverse (2) read
+    patterns_valid = (
+        match1 is not None
+        and match2 is not None
+        and os.path.dirname(file1) == os.path.dirname(file2)
+        and match1.group('base', 'sep', 'ext') == match2.group('base', 'sep', 'ext')
+        and {match1.group('mate'), match2.group('mate')} == {'1', '2'}
+    )
     
     if not patterns_valid:
         return (
             False,
             None,
             None,
-            "Selected files do not appear to be paired reads. Expected naming: *_R1/*_R2, *_1/*_2, or *.1./*.2."
+            "Selected files do not appear to be paired reads. Expected naming: *_R1/*_R2, *_1/*_2, or *.1/*.2, followed by .fq, .fastq, .fq.gz or .fastq.gz"
         )
     
-    return (True, forward_file, reverse_file, "")
+    if match1.group('mate') == '1':
+        return (True, file1, file2, "")
+    return (True, file2, file1, "")
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -442,17 +969,19 @@ def format_file_size(size_bytes: int) -> str:
     if size_bytes is None:
         return "Unknown"
     
-    # Define size units
-    units = ['B', 'KB', 'MB', 'GB', 'TB']
-    size = float(size_bytes)
-    unit_index = 0
-    
-    while size >= 1024.0 and unit_index < len(units) - 1:
-        size /= 1024.0
-        unit_index += 1
+    return _format_file_size(int(size_bytes))
+
+
+_FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_file_size(size_bytes: int) -> str:
+    """Format a byte count, picking the unit from its bit length."""
+    # Every 10 bits is one 1024x unit step
+    unit_index = min(max(0, (size_bytes.bit_length() - 1) // 10), len(_FILE_SIZE_UNITS) - 1)
     
     # Format with appropriate decimal places
     if unit_index == 0:  # Bytes
-        return f"{int(size)} {units[unit_index]}"
-    else:
-        return f"{size:.1f} {units[unit_index]}"
+        return f"{size_bytes} {_FILE_SIZE_UNITS[0]}"
+    return f"{size_bytes / (1 << (10 * unit_index)):.1f} {_FILE_SIZE_UNITS[unit_index]}"
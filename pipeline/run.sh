@@ -11,6 +11,7 @@ MIN_CONTIG_LEN=1000
 STEPS="fastqc,trimmomatic,megahit,prodigal,hmmscan,binning,checkm"
 JOB_ID="job_$(date +%s)"
 BUCKET=""
+PIPELINE_LOG="/data/pipeline.log"
 
 # Parse command line arguments
 while [[ $# -gt 0 ]]; do
@@ -47,11 +48,11 @@ is_step_enabled() {
     [[ ",$STEPS," == *",$1,"* ]]
 }
 
-# Function to log progress
+# Function to log progress; the whole log is re-uploaded so the copy in GCS only grows
 log_progress() {
-    echo "[$(date '+%Y-%m-%d %H:%M:%S')] $1"
+    echo "[$(date '+%Y-%m-%d %H:%M:%S')] $1" | tee -a "$PIPELINE_LOG"
     if [ -n "$BUCKET" ]; then
-        echo "$1" | gsutil cp - "gs://$BUCKET/jobs/$JOB_ID/pipeline.log" || true
+        gsutil -h "Cache-Control:no-cache" cp "$PIPELINE_LOG" "gs://$BUCKET/jobs/$JOB_ID/pipeline.log" || true
     fi
 }
 
@@ -209,7 +210,7 @@ fi
 # Upload all results to GCS
 if [ -n "$BUCKET" ]; then
     log_progress "Uploading results to GCS"
-    gsutil -m cp -r /data/results/* "gs://$BUCKET/results/$JOB_ID/" || true
+    gsutil -m -h "Cache-Control:private, max-age=86400, immutable" cp -r /data/results/* "gs://$BUCKET/results/$JOB_ID/" || true
     log_progress "Results uploaded to gs://$BUCKET/results/$JOB_ID/"
 fi
 
@@ -0,0 +1,39 @@
+"""Compile the .env file into config_cache.py so config.py can skip dotenv parsing.
+
+Run from the repository root after editing .env:
+
+    python tools/cache_env.py
+"""
+from pathlib import Path
+from dotenv import dotenv_values
+
+BASE_DIR = Path(__file__).parent.parent
+ENV_FILE = BASE_DIR / ".env"
+CACHE_FILE = BASE_DIR / "config_cache.py"
+
+
+def main():
+    """Write the key/value pairs from .env to config_cache.py as literals."""
+    if not ENV_FILE.exists():
+        print(f"Error: {ENV_FILE} not found")
+        return
+    
+    values = {
+        key: value
+        for key, value in dotenv_values(ENV_FILE).items()
+        if value is not None
+    }
+    
+    lines = [
+        '"""Cached .env values. Generated by tools/cache_env.py - do not edit."""',
+        "ENV = {",
+    ]
+    lines.extend(f"    {key!r}: {value!r}," for key, value in values.items())
+    lines.append("}")
+    
+    CACHE_FILE.write_text("\n".join(lines) + "\n")
+    print(f"Cached {len(values)} value(s) from {ENV_FILE} to {CACHE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
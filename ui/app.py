@@ -1,10 +1,14 @@
 """Gradio UI for Metagenomics Pipeline on GCP."""
+import asyncio
+import atexit
+import functools
 import gradio as gr
+import logging
 import uuid
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import AsyncIterator, Dict, Optional, Tuple
 import sys
 import os
 
@@ -12,30 +16,64 @@ import os
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from ui.theme import get_theme
-from gcp.storage import StorageHandler, validate_paired_files, format_file_size
+from gcp.storage import StorageHandler, get_storage_handler, shutdown, validate_paired_files, format_file_size
 from gcp.launcher import VMLauncher
 from gcp.monitor import JobMonitor
 import config
 
+log = logging.getLogger(__name__)
+
+
+# Pipeline step IDs, in the order their checkboxes are passed to the launch handler
+_STEP_IDS = tuple(config.PIPELINE_STEPS.keys())
+
+# Bold step names used in the pipeline progress panel, keyed by step ID
+_STEP_PREFIXES = {
+    step_id: f"**{step_info.name}**"
+    for step_id, step_info in config.PIPELINE_STEPS.items()
+}
+
+# Custom CSS layered on top of the theme, read once at import
+_CUSTOM_CSS = (config.UI_DIR / "static" / "custom.css").read_text()
+
 
 class MetagenomicsUI:
     """Main UI class for the metagenomics pipeline."""
     
     def __init__(self):
         """Initialize the UI components."""
-        self.storage = StorageHandler()
-        self.launcher = VMLauncher()
-        self.monitor = JobMonitor()
         self.current_job_id = None
         self.current_instance_name = None
         self.job_start_time = None
+        self.job_end_time = None  # Set once the job finishes, freezing its cost
         self.gcs_file_mapping = {}  # Maps display names to GCS paths
+        self._gcs_list_cache = {}  # (bucket, prefix) -> (listed_at, files)
+        self._warmup_started = False  # Set once the first page load starts the prefetch
+    
+    @functools.cached_property
+    def storage(self) -> StorageHandler:
+        """Storage handler, created on first use."""
+        return get_storage_handler()
+    
+    @functools.cached_property
+    def launcher(self) -> VMLauncher:
+        """VM launcher, created on first use."""
+        return VMLauncher()
+    
+    @functools.cached_property
+    def monitor(self) -> JobMonitor:
+        """Job monitor, created on first use."""
+        return JobMonitor()
+    
+    @functools.cached_property
+    def theme(self):
+        """Gradio theme, built on first use (at launch)."""
+        return get_theme()
     
     def create_ui(self):
         """Create and return the Gradio interface."""
-        # Store theme and CSS for launch
-        self.theme = get_theme()
-        self.custom_css = self._get_custom_css()
+        # Store CSS for launch; the theme is built when launch reads it
+        self.custom_css = _CUSTOM_CSS
         
         with gr.Blocks() as demo:
             # Header
@@ -51,7 +89,8 @@ class MetagenomicsUI:
             
             # Connection status
             with gr.Row():
-                gcp_status = gr.Markdown(self._check_gcp_connection(), elem_classes="status-box")
+                # Filled on page load, so no GCP client is created while building the UI
+                gcp_status = gr.Markdown("Checking GCP connection...", elem_classes="status-box")
             
             with gr.Tabs() as tabs:
                 # Tab 1: Upload & Configure
@@ -103,6 +142,11 @@ class MetagenomicsUI:
                                     )
                                     gcs_refresh_btn = gr.Button("🔄 Refresh", size="sm", scale=0)
                                 
+                                gcs_force_refresh = gr.Checkbox(
+                                    label="Bypass cached listing",
+                                    value=False
+                                )
+                                
                                 gcs_files = gr.CheckboxGroup(
                                     label="Available Files",
                                     choices=[],
@@ -139,8 +183,8 @@ class MetagenomicsUI:
                             step_checkboxes = {}
                             for step_id, step_info in config.PIPELINE_STEPS.items():
                                 step_checkboxes[step_id] = gr.Checkbox(
-                                    label=f"{step_info['emoji']} {step_info['name']}",
-                                    value=step_info['enabled']
+                                    label=f"{step_info.emoji} {step_info.name}",
+                                    value=step_info.enabled
                                 )
                     
                     with gr.Row():
@@ -165,12 +209,15 @@ class MetagenomicsUI:
                     with gr.Row():
                         refresh_btn = gr.Button("🔄 Refresh Status", size="sm")
                     
+                    # Pushes status changes without waiting for a click
+                    status_timer = gr.Timer(config.STATUS_PUSH_INTERVAL_SECONDS)
+                    # Status outputs last pushed to this session's browser
+                    last_status = gr.State(None)
+                    
                     with gr.Row():
                         with gr.Column():
                             job_info = gr.Markdown("### Job Information\nNo active job")
                             
-                            progress_bar = gr.Progress()
-                            
                             pipeline_status = gr.Markdown(
                                 self._render_pipeline_status({}),
                                 elem_classes="pipeline-status"
@@ -202,7 +249,7 @@ class MetagenomicsUI:
             # GCS refresh button
             gcs_refresh_btn.click(
                 fn=self._refresh_gcs_files,
-                inputs=[gcs_bucket, gcs_prefix],
+                inputs=[gcs_bucket, gcs_prefix, gcs_force_refresh],
                 outputs=[gcs_files, gcs_status]
             )
             
@@ -210,13 +257,15 @@ class MetagenomicsUI:
             file1.change(
                 fn=self._validate_file,
                 inputs=[file1],
-                outputs=[upload_status]
+                outputs=[upload_status],
+                concurrency_limit=config.GRADIO_CONCURRENCY_LIMIT
             )
             
             file2.change(
                 fn=self._validate_file,
                 inputs=[file2],
-                outputs=[upload_status]
+                outputs=[upload_status],
+                concurrency_limit=config.GRADIO_CONCURRENCY_LIMIT
             )
             
             # Launch pipeline
@@ -228,7 +277,13 @@ class MetagenomicsUI:
                     threads, min_contig_len,
                     *step_checkboxes.values()
                 ],
-                outputs=[launch_output, launch_btn, cancel_btn]
+                outputs=[launch_output, launch_btn, cancel_btn],
+                concurrency_limit=1,
+                concurrency_id="launch"
+            ).then(
+                # Resume status pushes stopped when the previous job finished
+                fn=lambda: gr.Timer(active=True),
+                outputs=[status_timer]
             )
             
             # Cancel job
@@ -243,37 +298,66 @@ class MetagenomicsUI:
                 outputs=[job_info, pipeline_status, cost_info, vm_info]
             )
             
+            status_timer.tick(
+                fn=self._push_status,
+                inputs=[last_status],
+                outputs=[job_info, pipeline_status, cost_info, vm_info, last_status, status_timer],
+                show_progress="hidden"
+            )
+            
             # Get results
             download_btn.click(
                 fn=self._get_results,
                 outputs=[results_display]
             )
+            
+            # Connection status, checked as each page loads
+            demo.load(fn=self._on_page_load, outputs=[gcp_status])
         
         return demo
     
-    def _check_gcp_connection(self) -> str:
-        """Check GCP connection status."""
-        if not config.GCP_PROJECT_ID:
-            return "⚠️ **GCP not configured.** Please set up your `.env` file with GCP credentials."
+    async def _on_page_load(self) -> str:
+        """Report the GCP connection status and start the prefetch on first load."""
+        status = await asyncio.to_thread(self._check_gcp_connection)
         
-        if self.storage.bucket is None:
-            return f"⚠️ **GCP configured but bucket not accessible.** Project: `{config.GCP_PROJECT_ID}`"
+        if not self._warmup_started:
+            self._warmup_started = True
+            # Not awaited, so the page doesn't wait for the launcher or listing
+            asyncio.get_running_loop().run_in_executor(None, self._warmup)
         
-        return f"✅ **Connected to GCP** - Project: `{config.GCP_PROJECT_ID}`, Bucket: `{config.GCP_BUCKET_NAME}`"
+        return status
+    
+    def _warmup(self):
+        """Create the VM launcher and fill the default GCS listing cache."""
+        try:
+            self.launcher
+            
+            bucket = config.GCS_BROWSER_DEFAULT_BUCKET or config.GCP_BUCKET_NAME
+            if bucket and self.storage.client:
+                self._fetch_gcs_files(bucket, config.GCS_BROWSER_DEFAULT_PREFIX)
+        except Exception as e:
+            log.warning("Prefetch failed: %s", e)
+    
+    def _check_gcp_connection(self) -> str:
+        """Check GCP connection status."""
+        return _gcp_connection_message(
+            config.GCP_PROJECT_ID,
+            self.storage.bucket is not None,
+            config.GCP_BUCKET_NAME
+        )
     
     def _validate_file(self, file) -> str:
         """Validate uploaded file."""
         if file is None:
             return ""
         
-        file_path = Path(file)
-        size_mb = file_path.stat().st_size / (1024 * 1024)
+        size_mb = os.stat(file).st_size / (1024 * 1024)
         size_gb = size_mb / 1024
         
         if size_gb > config.MAX_FILE_SIZE_GB:
             return f"❌ File too large: {size_gb:.2f} GB (max: {config.MAX_FILE_SIZE_GB} GB)"
         
-        return f"✅ File uploaded: {file_path.name} ({size_mb:.1f} MB)"
+        return f"✅ File uploaded: {os.path.basename(file)} ({size_mb:.1f} MB)"
     
     def _toggle_input_method(self, method: str) -> Tuple[gr.Group, gr.Group, str, str]:
         """Toggle between upload and GCS input methods."""
@@ -292,8 +376,13 @@ class MetagenomicsUI:
                 ""   # gcs_status
             )
     
-    def _refresh_gcs_files(self, bucket: str, prefix: str) -> Tuple[gr.CheckboxGroup, str]:
-        """Refresh the list of files from GCS."""
+    def _refresh_gcs_files(
+        self,
+        bucket: str,
+        prefix: str,
+        force_refresh: bool = False
+    ) -> Tuple[gr.CheckboxGroup, str]:
+        """Refresh the list of files from GCS, reusing recent listings unless forced."""
         if not bucket:
             return (
                 gr.CheckboxGroup(choices=[], value=[]),
@@ -301,12 +390,18 @@ class MetagenomicsUI:
             )
         
         try:
-            # List files from GCS
-            files = self.storage.list_gcs_files(
-                bucket_name=bucket,
-                prefix=prefix,
-                file_extensions=config.GCS_ALLOWED_EXTENSIONS
-            )
+            # Reuse a recent listing of the same location
+            cache_key = (bucket, prefix)
+            cached = self._gcs_list_cache.get(cache_key)
+            
+            if (
+                not force_refresh
+                and cached is not None
+                and time.monotonic() - cached[0] < config.GCS_LIST_TTL_SECONDS
+            ):
+                files = cached[1]
+            else:
+                files = self._fetch_gcs_files(bucket, prefix)
             
             if not files:
                 return (
@@ -314,18 +409,24 @@ class MetagenomicsUI:
                     f"ℹ️ No FASTQ files found in gs://{bucket}/{prefix}"
                 )
             
-            # Create choices with file names and sizes
-            choices = [f"{f['name']} ({f['size_human_readable']})" for f in files]
+            # Create choices with file names and sizes, and map each back to its path
+            choices = []
+            mapping = {}
+            for f in files:
+                label = f"{f['name']} ({f['size_human_readable']})"
+                choices.append(label)
+                mapping[label] = f['path']
             
             # Store the mapping for later use
-            self.gcs_file_mapping = {
-                f"{f['name']} ({f['size_human_readable']})": f['path']
-                for f in files
-            }
+            self.gcs_file_mapping = mapping
+            
+            found = f"✅ Found {len(files)} file(s) in gs://{bucket}/{prefix}"
+            if len(files) >= config.GCS_BROWSER_MAX_FILES:
+                found += " (showing the first matches; narrow the prefix to see more)"
             
             return (
                 gr.CheckboxGroup(choices=choices, value=[]),
-                f"✅ Found {len(files)} file(s) in gs://{bucket}/{prefix}"
+                found
             )
         
         except Exception as e:
@@ -334,7 +435,25 @@ class MetagenomicsUI:
                 f"❌ Error listing files: {str(e)}"
             )
     
-    def _launch_pipeline(
+    def _fetch_gcs_files(self, bucket: str, prefix: str) -> list:
+        """List files from GCS and cache the listing."""
+        files = list(self.storage.list_gcs_files(
+            bucket_name=bucket,
+            prefix=prefix,
+            file_extensions=config.GCS_ALLOWED_EXTENSIONS,
+            max_results=config.GCS_BROWSER_MAX_FILES
+        ))
+        self._gcs_list_cache[(bucket, prefix)] = (time.monotonic(), files)
+        return files
+    
+    def _invalidate_listing(self, bucket: str, path_prefix: str):
+        """Drop cached listings of a bucket that could include objects under path_prefix."""
+        for cache_key in list(self._gcs_list_cache):
+            cached_bucket, cached_prefix = cache_key
+            if cached_bucket == bucket and path_prefix.startswith(cached_prefix):
+                self._gcs_list_cache.pop(cache_key, None)
+    
+    async def _launch_pipeline(
         self,
         input_method,
         file1,
@@ -344,9 +463,10 @@ class MetagenomicsUI:
         gcs_files,
         threads,
         min_contig_len,
+        progress=gr.Progress(),
         *step_flags
-    ) -> Tuple[str, gr.Button, gr.Button]:
-        """Launch the pipeline on GCP."""
+    ) -> AsyncIterator[Tuple[str, gr.Button, gr.Button]]:
+        """Launch the pipeline on GCP, streaming progress for each stage."""
         # Validate inputs based on method
         gcs_uri1 = None
         gcs_uri2 = None
@@ -354,81 +474,110 @@ class MetagenomicsUI:
         if input_method == "Upload from computer":
             # Validate uploaded files
             if file1 is None or file2 is None:
-                return (
+                yield (
                     "❌ Please upload both forward and reverse read files.",
                     gr.Button(visible=True),
                     gr.Button(visible=False)
                 )
+                return
         else:
             # Validate GCS selections
             if not gcs_files or len(gcs_files) == 0:
-                return (
+                yield (
                     "❌ Please select files from Google Cloud Storage.",
                     gr.Button(visible=True),
                     gr.Button(visible=False)
                 )
+                return
             
             # Get actual file paths from mapping
             selected_paths = []
             for f in gcs_files:
                 path = self.gcs_file_mapping.get(f)
                 if path is None:
-                    return (
+                    yield (
                         f"❌ Error: Could not find file path for '{f}'. Please refresh the file list.",
                         gr.Button(visible=True),
                         gr.Button(visible=False)
                     )
+                    return
                 selected_paths.append(path)
             
             # Validate paired files
             is_valid, forward_file, reverse_file, error_msg = validate_paired_files(selected_paths)
             
             if not is_valid:
-                return (
+                yield (
                     f"❌ {error_msg}",
                     gr.Button(visible=True),
                     gr.Button(visible=False)
                 )
+                return
             
             # Build GCS URIs
             gcs_uri1 = f"gs://{gcs_bucket}/{forward_file}"
             gcs_uri2 = f"gs://{gcs_bucket}/{reverse_file}"
         
         if not config.GCP_PROJECT_ID or not config.GCP_BUCKET_NAME:
-            return (
+            yield (
                 "❌ GCP not configured. Please set up your `.env` file.",
                 gr.Button(visible=True),
                 gr.Button(visible=False)
             )
+            return
         
         try:
             # Generate job ID
             self.current_job_id = f"job_{uuid.uuid4().hex[:8]}_{int(time.time())}"
             self.current_instance_name = f"pipeline-{self.current_job_id}"
             self.job_start_time = datetime.now()
+            self.job_end_time = None
             
             # Handle file inputs based on method
             if input_method == "Upload from computer":
-                # Upload files to GCS (existing flow)
+                # Upload both files to GCS concurrently, off the event loop
                 blob1 = f"inputs/{self.current_job_id}/CV_1.fq.gz"
                 blob2 = f"inputs/{self.current_job_id}/CV_2.fq.gz"
                 
-                gcs_uri1 = self.storage.upload_file(file1, blob1)
-                gcs_uri2 = self.storage.upload_file(file2, blob2)
+                yield (
+                    "⏳ Uploading forward (R1) and reverse (R2) reads to GCS...",
+                    gr.Button(visible=False),
+                    gr.Button(visible=False)
+                )
+                
+                # Report combined bytes sent across both uploads as chunks go out
+                total_bytes = os.stat(file1).st_size + os.stat(file2).st_size
+                uploaded = {blob1: 0, blob2: 0}
+                
+                def upload_progress(blob_name):
+                    def callback(bytes_uploaded, _file_bytes):
+                        uploaded[blob_name] = bytes_uploaded
+                        progress(
+                            (sum(uploaded.values()), total_bytes),
+                            desc="Uploading R1 and R2",
+                            unit="bytes"
+                        )
+                    return callback
+                
+                gcs_uri1, gcs_uri2 = await asyncio.gather(
+                    asyncio.to_thread(self.storage.upload_file, file1, blob1, upload_progress(blob1)),
+                    asyncio.to_thread(self.storage.upload_file, file2, blob2, upload_progress(blob2))
+                )
+                
+                if gcs_uri1 or gcs_uri2:
+                    self._invalidate_listing(config.GCP_BUCKET_NAME, f"inputs/{self.current_job_id}/")
                 
                 if not gcs_uri1 or not gcs_uri2:
-                    return (
+                    yield (
                         "❌ Failed to upload files to GCS.",
                         gr.Button(visible=True),
                         gr.Button(visible=False)
                     )
+                    return
             # else: gcs_uri1 and gcs_uri2 are already set from GCS selection
             
-            # Build enabled steps dictionary
-            enabled_steps = {}
-            step_ids = list(config.PIPELINE_STEPS.keys())
-            for i, step_id in enumerate(step_ids):
-                enabled_steps[step_id] = bool(step_flags[i])
+            # Build enabled steps dictionary (checkboxes follow PIPELINE_STEPS order)
+            enabled_steps = dict(zip(_STEP_IDS, map(bool, step_flags)))
             
             # Generate startup script
             startup_script = self.launcher.generate_startup_script(
@@ -442,22 +591,28 @@ class MetagenomicsUI:
             
             # Launch VM
             machine_type = "n1-standard-16"
-            instance_name = self.launcher.create_vm(
+            yield (
+                f"⏳ Creating VM `{self.current_instance_name}`...",
+                gr.Button(visible=False),
+                gr.Button(visible=False)
+            )
+            instance_name = await self.launcher.create_vm_async(
                 instance_name=self.current_instance_name,
                 machine_type=machine_type,
                 startup_script=startup_script
             )
             
             if not instance_name:
-                return (
+                yield (
                     "❌ Failed to launch VM on GCP.",
                     gr.Button(visible=True),
                     gr.Button(visible=False)
                 )
+                return
             
             input_source = "uploaded files" if input_method == "Upload from computer" else "GCS files"
             
-            return (
+            yield (
                 f"✅ **Pipeline launched successfully!**\n\n"
                 f"- **Job ID:** `{self.current_job_id}`\n"
                 f"- **VM Instance:** `{instance_name}`\n"
@@ -470,42 +625,51 @@ class MetagenomicsUI:
             )
         
         except Exception as e:
-            return (
+            yield (
                 f"❌ Error launching pipeline: {str(e)}",
                 gr.Button(visible=True),
                 gr.Button(visible=False)
             )
     
-    def _cancel_job(self) -> Tuple[str, gr.Button, gr.Button]:
-        """Cancel the current job."""
+    async def _cancel_job(self) -> AsyncIterator[Tuple[str, gr.Button, gr.Button]]:
+        """Cancel the current job, streaming progress while the VM is deleted."""
         if not self.current_job_id or not self.current_instance_name:
-            return (
+            yield (
                 "❌ No active job to cancel.",
                 gr.Button(visible=True),
                 gr.Button(visible=False)
             )
+            return
         
         try:
-            success = self.monitor.cancel_job(
+            yield (
+                f"⏳ Cancelling job `{self.current_job_id}`...",
+                gr.Button(visible=False),
+                gr.Button(visible=False)
+            )
+            success = await asyncio.to_thread(
+                self.monitor.cancel_job,
                 self.current_job_id,
                 self.current_instance_name
             )
             
             if success:
-                return (
+                # The VM is gone: freeze the cost and let status pushes stop
+                self.job_end_time = datetime.now()
+                yield (
                     f"✅ Job `{self.current_job_id}` cancelled successfully.",
                     gr.Button(visible=True),
                     gr.Button(visible=False)
                 )
             else:
-                return (
+                yield (
                     f"❌ Failed to cancel job `{self.current_job_id}`.",
                     gr.Button(visible=False),
                     gr.Button(visible=True)
                 )
         
         except Exception as e:
-            return (
+            yield (
                 f"❌ Error cancelling job: {str(e)}",
                 gr.Button(visible=False),
                 gr.Button(visible=True)
@@ -528,38 +692,51 @@ class MetagenomicsUI:
             )
             
             # Job info
-            job_info = f"""### Job Information
-- **Job ID:** `{self.current_job_id}`
-- **Status:** {config.STATUS_EMOJIS.get(status['status'], '❓')} {status['status'].upper()}
-- **Progress:** {status['progress']}%
-"""
+            job_parts = [
+                "### Job Information",
+                f"- **Job ID:** `{self.current_job_id}`",
+                f"- **Status:** {config.STATUS_EMOJIS.get(status['status'], '❓')} {status['status'].upper()}",
+                f"- **Progress:** {status['progress']}%",
+            ]
             
             if status.get('current_step'):
-                step_info = config.PIPELINE_STEPS.get(status['current_step'], {})
-                job_info += f"- **Current Step:** {step_info.get('emoji', '')} {step_info.get('name', status['current_step'])}\n"
+                step_info = config.PIPELINE_STEPS.get(status['current_step'])
+                step_label = f"{step_info.emoji} {step_info.name}" if step_info else status['current_step']
+                job_parts.append(f"- **Current Step:** {step_label}")
+            
+            job_parts.append("")
+            job_info = "\n".join(job_parts)
             
             # Pipeline status
             pipeline_status = self._render_pipeline_status(status.get('steps', {}))
             
-            # Cost estimate
+            # Cost estimate, final once the job has finished
+            if self.job_end_time is None and status['status'] in ('complete', 'failed'):
+                self.job_end_time = datetime.now()
+            
             if self.job_start_time:
                 cost = self.monitor.estimate_cost(
                     "n1-standard-16",
-                    self.job_start_time
+                    self.job_start_time,
+                    self.job_end_time
                 )
-                elapsed = datetime.now() - self.job_start_time
-                cost_info = f"""### Cost Estimate
-- **Elapsed Time:** {str(elapsed).split('.')[0]}
-- **Estimated Cost:** ${cost:.4f}
-"""
+                elapsed = (self.job_end_time or datetime.now()) - self.job_start_time
+                cost_info = "\n".join((
+                    "### Cost Estimate",
+                    f"- **Elapsed Time:** {str(elapsed).split('.')[0]}",
+                    f"- **Estimated Cost:** ${cost:.4f}",
+                    "",
+                ))
             else:
                 cost_info = "### Cost Estimate\n$0.00"
             
             # VM status
-            vm_info = f"""### VM Status
-- **Instance:** `{self.current_instance_name}`
-- **Status:** {status.get('vm_status', 'unknown')}
-"""
+            vm_info = "\n".join((
+                "### VM Status",
+                f"- **Instance:** `{self.current_instance_name}`",
+                f"- **Status:** {status.get('vm_status', 'unknown')}",
+                "",
+            ))
             
             return job_info, pipeline_status, cost_info, vm_info
         
@@ -571,24 +748,42 @@ class MetagenomicsUI:
                 "### VM Status\nError"
             )
     
-    def _render_pipeline_status(self, steps: Dict) -> str:
-        """Render the pipeline status as a visual flowchart."""
-        status_html = "### Pipeline Progress\n\n"
+    def _push_status(self, last_status: Optional[Tuple]) -> Tuple:
+        """
+        Send only the status outputs that changed since this session's last tick.
         
-        if not steps:
-            status_html += "_No pipeline steps to display_"
-            return status_html
+        Once the job has finished (or was cancelled) and this session has its
+        final status, the timer is switched off until the next launch.
         
-        for step_id, step_info in config.PIPELINE_STEPS.items():
-            step_status = steps.get(step_id, {"status": "pending", "progress": 0})
-            status = step_status.get("status", "pending")
-            progress = step_status.get("progress", 0)
-            
-            emoji = config.STATUS_EMOJIS.get(status, "⏳")
+        Args:
+            last_status: Outputs last pushed to this session, or None on its first tick
             
-            status_html += f"{emoji} **{step_info['name']}** - {status.upper()} ({progress}%)\n\n"
+        Returns:
+            Tuple of (job_info, pipeline_status, cost_info, vm_info, last_status, status_timer)
+        """
+        if not self.current_job_id:
+            return (gr.update(),) * 4 + (None, gr.update())
         
-        return status_html
+        if self.job_end_time is not None and last_status is not None:
+            # Final status already shown; stop polling without probing again
+            return (gr.update(),) * 4 + (last_status, gr.Timer(active=False))
+        
+        status = self._refresh_status()
+        last_outputs = last_status or (None,) * 4
+        timer = gr.Timer(active=self.job_end_time is None)
+        
+        return tuple(
+            gr.update() if output == last_output else output
+            for output, last_output in zip(status, last_outputs)
+        ) + (status, timer)
+    
+    def _render_pipeline_status(self, steps: Dict) -> str:
+        """Render the pipeline status as a visual flowchart."""
+        # Freeze the fields that affect rendering into a hashable cache key
+        return _render_pipeline_status_cached(tuple(sorted(
+            (step_id, step_status.get("status", "pending"), step_status.get("progress", 0))
+            for step_id, step_status in steps.items()
+        )))
     
     def _get_results(self) -> str:
         """Get download links for results."""
@@ -632,45 +827,57 @@ class MetagenomicsUI:
         
         except Exception as e:
             return f"### Results\n❌ Error fetching results: {str(e)}"
+
+
+
+@functools.lru_cache(maxsize=8)
+def _gcp_connection_message(project_id: str, bucket_accessible: bool, bucket_name: str) -> str:
+    """Build the GCP connection status message."""
+    if not project_id:
+        return "⚠️ **GCP not configured.** Please set up your `.env` file with GCP credentials."
     
-    def _get_custom_css(self) -> str:
-        """Get custom CSS for the UI."""
-        return """
-        .header {
-            text-align: center;
-            padding: 2rem 1rem;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border-radius: 8px;
-            margin-bottom: 2rem;
-        }
-        
-        .status-box {
-            padding: 1rem;
-            border-radius: 8px;
-            background: #F8FAFC;
-            border: 1px solid #E2E8F0;
-        }
+    if not bucket_accessible:
+        return f"⚠️ **GCP configured but bucket not accessible.** Project: `{project_id}`"
+    
+    return f"✅ **Connected to GCP** - Project: `{project_id}`, Bucket: `{bucket_name}`"
+
+
+@functools.lru_cache(maxsize=8)
+def _render_pipeline_status_cached(steps: tuple) -> str:
+    """Render pipeline status from (step_id, status, progress) tuples."""
+    status_html = "### Pipeline Progress\n\n"
+    
+    if not steps:
+        status_html += "_No pipeline steps to display_"
+        return status_html
+    
+    step_states = {step_id: (status, progress) for step_id, status, progress in steps}
+    lines = [status_html]
+    
+    for step_id, step_prefix in _STEP_PREFIXES.items():
+        status, progress = step_states.get(step_id, ("pending", 0))
         
-        .upload-status {
-            margin-top: 1rem;
-            padding: 0.5rem;
-        }
+        emoji = config.STATUS_EMOJIS.get(status, "⏳")
         
-        .pipeline-status {
-            font-family: monospace;
-            background: #F8FAFC;
-            padding: 1rem;
-            border-radius: 8px;
-        }
-        """
+        lines.append(f"{emoji} {step_prefix} - {status.upper()} ({progress}%)\n\n")
+    
+    return "".join(lines)
 
 
 def main():
     """Main entry point for the application."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    # Close the shared GCS connection pool when the server exits
+    atexit.register(shutdown)
     app = MetagenomicsUI()
     demo = app.create_ui()
     
+    # Run independent handlers side by side so one long upload can't block the rest
+    demo.queue(
+        default_concurrency_limit=config.GRADIO_CONCURRENCY_LIMIT,
+        max_size=config.GRADIO_MAX_QUEUE_SIZE
+    )
+    
     demo.launch(
         server_name=config.GRADIO_SERVER_NAME,
         server_port=config.GRADIO_SERVER_PORT,
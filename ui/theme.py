@@ -1,35 +1,92 @@
 """Custom futuristic light theme for Gradio UI."""
-from gradio.themes.base import Base
-from gradio.themes.utils import colors, fonts, sizes
+import functools
+import threading
+import config
 
 
-class FuturisticTheme(Base):
-    """A modern, futuristic light-themed Gradio interface."""
+# Font fallbacks, so text stays sans/monospace when the Google Fonts CDN is
+# unreachable or disabled (THEME_GOOGLE_FONTS=0)
+_SANS_FALLBACKS = ("ui-sans-serif", "system-ui", "sans-serif")
+_MONO_FALLBACKS = ("ui-monospace", "Consolas", "monospace")
+
+
+@functools.lru_cache(maxsize=1)
+def _theme_class() -> type:
+    """
+    Build the FuturisticTheme class, importing Gradio's theming on first use.
+    
+    Keeps importing this module cheap for code that never builds a theme.
+    
+    Returns:
+        The FuturisticTheme class
+    """
+    from gradio.themes.base import Base
+    from gradio.themes.utils import colors, fonts, sizes
+    
+    if config.THEME_GOOGLE_FONTS:
+        font = (fonts.GoogleFont("Inter"), *_SANS_FALLBACKS)
+        font_mono = (fonts.GoogleFont("IBM Plex Mono"), *_MONO_FALLBACKS)
+    else:
+        font = ("Inter", *_SANS_FALLBACKS)
+        font_mono = ("IBM Plex Mono", *_MONO_FALLBACKS)
     
-    def __init__(
-        self,
-        *,
-        primary_hue: colors.Color = colors.blue,
-        secondary_hue: colors.Color = colors.cyan,
-        neutral_hue: colors.Color = colors.slate,
-        spacing_size: sizes.Size = sizes.spacing_md,
-        radius_size: sizes.Size = sizes.radius_md,
-        text_size: sizes.Size = sizes.text_md,
-        font: fonts.Font = fonts.GoogleFont("Inter"),
-        font_mono: fonts.Font = fonts.GoogleFont("IBM Plex Mono"),
-    ):
-        super().__init__(
-            primary_hue=primary_hue,
-            secondary_hue=secondary_hue,
-            neutral_hue=neutral_hue,
-            spacing_size=spacing_size,
-            radius_size=radius_size,
-            text_size=text_size,
-            font=font,
-            font_mono=font_mono,
-        )
+    class FuturisticTheme(Base):
+        """A modern, futuristic light-themed Gradio interface."""
+        
+        def __init__(self):
+            super().__init__(
+                primary_hue=colors.blue,
+                secondary_hue=colors.cyan,
+                neutral_hue=colors.slate,
+                spacing_size=sizes.spacing_md,
+                radius_size=sizes.radius_md,
+                text_size=sizes.text_md,
+                font=font,
+                font_mono=font_mono,
+            )
+        
+        def set(self, **kwargs):
+            """Set theme variables, discarding any cached stylesheet and dict."""
+            self._theme_css = None
+            self._theme_dict = None
+            return super().set(**kwargs)
+        
+        def _get_theme_css(self) -> str:
+            """Return the theme's CSS variables, generating them only once."""
+            if self._theme_css is None:
+                self._theme_css = super()._get_theme_css()
+            return self._theme_css
+        
+        def to_dict(self) -> dict:
+            """Return the theme as a dict, walking its attributes only once."""
+            if self._theme_dict is None:
+                self._theme_dict = super().to_dict()
+            return {"theme": dict(self._theme_dict["theme"])}
+    
+    # Report the public module-level name, so pickling and name lookups resolve
+    # through the module __getattr__ below
+    FuturisticTheme.__module__ = __name__
+    FuturisticTheme.__qualname__ = "FuturisticTheme"
+    return FuturisticTheme
+
+
+def __getattr__(name: str):
+    """Resolve FuturisticTheme lazily, together with the Gradio imports."""
+    if name == "FuturisticTheme":
+        return _theme_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Built once per process on first use, so Gradio's theme CSS is generated a single time
+_theme = None
+_theme_lock = threading.Lock()
 
 
 def get_theme():
-    """Get the custom futuristic theme instance."""
-    return FuturisticTheme()
+    """Get the shared custom futuristic theme instance."""
+    global _theme
+    if _theme is None:
+        with _theme_lock:
+            if _theme is None:
+                _theme = _theme_class()()
+    return _theme